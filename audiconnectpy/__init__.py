@@ -1,6 +1,46 @@
 """audiconnectpy package."""
 
+from .accounts import AudiFleet
+from .admission import LoginAdmission
 from .api import MODELS, AudiConnect
+from .cache import ResponseCache
+from .changes import ChangeEvent
 from .exceptions import AudiException, AuthorizationError
+from .exporter import MetricsServer
+from .fleet import BulkReport
+from .hedging import HedgePolicy
+from .lanes import LaneScheduler
+from .metrics import LoopLagProbe, Metrics
+from .offload import Offloader
+from .scheduler import PollScheduler, RequestBudget
+from .session import create_session
+from .sharding import ShardWorker, run_sharded
+from .stats import UpdateStats
+from .store import SharedStore
+from .tracing import SpanRecorder
 
-__all__ = ["AudiConnect", "AudiException", "AuthorizationError", "MODELS"]
+__all__ = [
+    "AudiConnect",
+    "AudiException",
+    "AudiFleet",
+    "AuthorizationError",
+    "BulkReport",
+    "ChangeEvent",
+    "HedgePolicy",
+    "LaneScheduler",
+    "LoginAdmission",
+    "LoopLagProbe",
+    "Metrics",
+    "MetricsServer",
+    "Offloader",
+    "PollScheduler",
+    "RequestBudget",
+    "ResponseCache",
+    "ShardWorker",
+    "SharedStore",
+    "SpanRecorder",
+    "UpdateStats",
+    "MODELS",
+    "create_session",
+    "run_sharded",
+]
@@ -0,0 +1,147 @@
+"""Several Audi Connect accounts."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from random import uniform
+from typing import Any, Self
+
+from aiohttp import ClientSession
+
+from .admission import LoginAdmission
+from .api import AudiConnect
+from .cache import DiscoveryCache, ResponseCache
+from .const import FLEET_REFRESH_SPREAD, FLEET_STAGGER
+from .exceptions import AudiException
+from .lanes import LaneScheduler
+from .scheduler import PollScheduler, RequestBudget
+from .session import create_session
+from .store import SharedStore
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class AudiFleet:
+    """Accounts sharing one session, discovery cache, request and login slots, budget.
+
+    Logins are staggered by `stagger` seconds (plus jitter) and token
+    renewals are spread over `refresh_spread` seconds, so the identity
+    provider sees a smooth load.
+    """
+
+    def __init__(
+        self,
+        session: ClientSession | None = None,
+        *,
+        lanes: LaneScheduler | None = None,
+        budget: RequestBudget | None = None,
+        cache: ResponseCache | None = None,
+        admission: LoginAdmission | None = None,
+        store: SharedStore | None = None,
+        stagger: float = FLEET_STAGGER,
+        refresh_spread: float = FLEET_REFRESH_SPREAD,
+    ) -> None:
+        """Initialize.
+
+        Without session, a managed session is created (and closed with the fleet).
+        """
+        self._session = session
+        self._managed = False
+        self.store = store
+        self.discovery = DiscoveryCache(store)
+        self.lanes = LaneScheduler() if lanes is None else lanes
+        self.budget = budget
+        self.cache = cache
+        self.admission = LoginAdmission() if admission is None else admission
+        self.stagger = stagger
+        self.refresh_spread = refresh_spread
+        self.accounts: dict[str, AudiConnect] = {}
+        self.schedulers: dict[str, PollScheduler] = {}
+
+    @property
+    def session(self) -> ClientSession:
+        """Return shared session, a managed one is created on first use."""
+        if self._session is None:
+            self._session = create_session()
+            self._managed = True
+        return self._session
+
+    def add_account(
+        self,
+        username: str,
+        password: str,
+        country: str = "DE",
+        spin: str | None = None,
+        **kwargs: Any,
+    ) -> AudiConnect:
+        """Add an account sharing the fleet resources."""
+        api = AudiConnect(
+            self._session,
+            username,
+            password,
+            country,
+            spin,
+            lanes=self.lanes,
+            cache=self.cache,
+            discovery=self.discovery,
+            admission=self.admission,
+            store=self.store,
+            **kwargs,
+        )
+        api.auth.session_factory = lambda: self.session
+        self.accounts[username] = api
+        self._spread_refresh()
+        return api
+
+    def remove_account(self, username: str) -> None:
+        """Remove an account."""
+        self.accounts.pop(username, None)
+        self.schedulers.pop(username, None)
+        self._spread_refresh()
+
+    def _spread_refresh(self) -> None:
+        """Renew tokens of accounts at different times."""
+        for index, api in enumerate(self.accounts.values()):
+            api.auth.refresh_skew = self.refresh_spread * index / len(self.accounts)
+
+    async def async_login(self) -> dict[str, AudiException | None]:
+        """Login accounts one after the other, return errors by username."""
+
+        async def login(index: int, username: str) -> AudiException | None:
+            await asyncio.sleep(index * self.stagger + uniform(0, self.stagger))
+            try:
+                await self.accounts[username].async_login()
+            except AudiException as error:
+                _LOGGER.error("Login failed - %s - (%s)", username, error)
+                return error
+            return None
+
+        results = await asyncio.gather(
+            *(login(index, username) for index, username in enumerate(self.accounts))
+        )
+        return dict(zip(self.accounts, results))
+
+    async def async_run(self, **kwargs: Any) -> None:
+        """Poll vehicles of all accounts (options of PollScheduler)."""
+        for username, api in self.accounts.items():
+            if username not in self.schedulers:
+                self.schedulers[username] = PollScheduler(
+                    api, budget=self.budget, **kwargs
+                )
+        await asyncio.gather(
+            *(scheduler.async_run() for scheduler in self.schedulers.values())
+        )
+
+    async def async_close(self) -> None:
+        """Close managed session."""
+        if self._managed and self._session is not None:
+            await self._session.close()
+
+    async def __aenter__(self) -> Self:
+        """Async enter."""
+        return self
+
+    async def __aexit__(self, *_exc_info: object) -> None:
+        """Async exit."""
+        await self.async_close()
@@ -0,0 +1,132 @@
+"""Admission control of logins."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+import logging
+from random import uniform
+import time
+
+from .const import LOGIN_BACKOFF, LOGIN_BACKOFF_MAX, LOGIN_CONCURRENCY, LOGIN_TRIES
+from .exceptions import (
+    AudiException,
+    HttpRequestError,
+    ServiceNotFoundError,
+    TimeoutExceededError,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _transient(error: AudiException) -> bool:
+    """Return True if login may succeed later (network, throttling, outage)."""
+    if isinstance(error, ServiceNotFoundError):
+        return error.status is not None and (error.status == 429 or error.status >= 500)
+    return isinstance(error, HttpRequestError | TimeoutExceededError)
+
+
+class LoginAdmission:
+    """Bound concurrent logins, shared between accounts.
+
+    Logins wait in a queue for one of `concurrency` slots. A login failed
+    on a transient error (network, time out, HTTP 429 or 5xx) closes
+    admission for every account during an exponential backoff
+    (`backoff` * 2^failures, capped to `max_backoff`, jittered), a
+    successful one resets it. Other errors are raised at once.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = LOGIN_CONCURRENCY,
+        backoff: float = LOGIN_BACKOFF,
+        max_backoff: float = LOGIN_BACKOFF_MAX,
+        tries: int = LOGIN_TRIES,
+    ) -> None:
+        """Initialize."""
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.tries = tries
+        self.failures = 0
+        self.depth = 0
+        self.max_depth = 0
+        self.logins = 0
+        self.failed = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.duration_total = 0.0
+        self.duration_max = 0.0
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._resume_at = 0.0
+
+    @property
+    def wait_avg(self) -> float:
+        """Return average wait before a login attempt."""
+        attempts = self.logins + self.failed
+        return self.wait_total / attempts if attempts else 0.0
+
+    @property
+    def duration_avg(self) -> float:
+        """Return average duration of a login attempt."""
+        attempts = self.logins + self.failed
+        return self.duration_total / attempts if attempts else 0.0
+
+    async def async_login(self, login: Callable[[], Awaitable[None]]) -> None:
+        """Run login when admitted, retry with backoff on transient errors."""
+        error: Exception | None = None
+        for _ in range(self.tries):
+            start = time.monotonic()
+            self.depth += 1
+            self.max_depth = max(self.max_depth, self.depth)
+            try:
+                await self._semaphore.acquire()
+            finally:
+                self.depth -= 1
+            try:
+                while (wait := self._resume_at - time.monotonic()) > 0:
+                    # Admission closed, wake up spread over the backoff
+                    await asyncio.sleep(wait + uniform(0, self.backoff))
+                admitted = time.monotonic()
+                self._record_wait(admitted - start)
+                try:
+                    await login()
+                except AudiException as err:
+                    if not _transient(err):
+                        self.failed += 1
+                        self._record_duration(time.monotonic() - admitted)
+                        raise
+                    error = err
+                    self._record_failure(time.monotonic() - admitted)
+                    _LOGGER.warning("Login failed (%s), admission closed", err)
+                    continue
+                self._record_success(time.monotonic() - admitted)
+                return
+            finally:
+                self._semaphore.release()
+        raise TimeoutExceededError(f"Login failed after {self.tries} tries ({error})")
+
+    def _record_wait(self, wait: float) -> None:
+        """Record wait in queue."""
+        self.wait_total += wait
+        self.wait_max = max(self.wait_max, wait)
+
+    def _record_success(self, duration: float) -> None:
+        """Record successful login and reopen admission."""
+        self.logins += 1
+        self.failures = 0
+        self._record_duration(duration)
+
+    def _record_failure(self, duration: float) -> None:
+        """Record failed login and close admission."""
+        self.failed += 1
+        self.failures += 1
+        self._record_duration(duration)
+        delay = min(self.max_backoff, self.backoff * 2 ** (self.failures - 1))
+        self._resume_at = max(
+            self._resume_at, time.monotonic() + delay * uniform(0.5, 1)
+        )
+
+    def _record_duration(self, duration: float) -> None:
+        """Record duration of a login attempt."""
+        self.duration_total += duration
+        self.duration_max = max(self.duration_max, duration)
@@ -2,17 +2,42 @@
 
 from __future__ import annotations
 
+import asyncio
 from collections import namedtuple
+from collections.abc import Iterable
 import logging
+import time
 from typing import Any, Literal, NamedTuple, Self
 
 from aiohttp import ClientSession
+from pydantic import ValidationError
 
+from .admission import LoginAdmission
 from .auth import Auth
-from .const import CLIENT_IDS, URL_HOME_REGION, URL_HOME_REGION_SETTER
-from .exceptions import AudiException
-from .helpers import ExtendedDict
-from .vehicle import Globals, Vehicle
+from .cache import DiscoveryCache, ResponseCache
+from .changes import ChangeHub, ChangeSubscription, Overflow
+from .commands import COMMANDS
+from .const import (
+    BULK_CONCURRENCY,
+    CHANGES_MAXSIZE,
+    CLIENT_IDS,
+    GRAPHQL_VEHICLE_FIELDS,
+    URL_HOME_REGION,
+    URL_HOME_REGION_SETTER,
+)
+from .exceptions import AudiException, TimeoutExceededError
+from .fleet import BulkReport, CommandOutcome
+from .hedging import HedgePolicy
+from .helpers import ExtendedDict, deadline
+from .lanes import LaneScheduler
+from .metrics import Metrics
+from .model import Location
+from .offload import Offloader
+from .stats import UpdateStats, collect
+from .store import SharedStore
+from .tracing import start_span
+from .units import UnitSystem
+from .vehicle import Vehicle
 
 MODELS = list(CLIENT_IDS)
 
@@ -24,20 +49,61 @@ class AudiConnect:
 
     def __init__(
         self,
-        session: ClientSession,
+        session: ClientSession | None,
         username: str,
         password: str,
         country: str = "DE",
         spin: str | None = None,
         *,
-        unit_system: str = "metric",
+        unit_system: UnitSystem = "metric",
         model: Literal["standard", "e-tron"] = "standard",
+        hedging: HedgePolicy | None = None,
+        timeouts: dict[str, float] | None = None,
+        prewarm: bool = False,
+        coalesce: bool = True,
+        cache: ResponseCache | None = None,
+        lanes: LaneScheduler | None = None,
+        discovery: DiscoveryCache | None = None,
+        admission: LoginAdmission | None = None,
+        store: SharedStore | None = None,
+        offload: Offloader | None = None,
+        metrics: Metrics | None = None,
+        tracer: Any = None,
     ) -> None:
-        """Initialize."""
-        Globals(unit_system)
-        self.auth = Auth(session, username, password, country.upper(), model)
+        """Initialize.
+
+        Without session, a managed session tuned for Audi Connect is created
+        on first request (and closed with the account).
+        With tracer (OpenTelemetry tracer or SpanRecorder), spans are recorded.
+        """
+        self._prewarm = prewarm
+        self.auth = Auth(
+            session,
+            username,
+            password,
+            country.upper(),
+            model,
+            hedging=hedging,
+            timeouts=timeouts,
+            coalesce=coalesce,
+            cache=cache,
+            lanes=lanes,
+            discovery=discovery,
+            admission=admission,
+            store=store,
+            offload=offload,
+            metrics=metrics,
+            tracer=tracer,
+        )
         self._spin = str(spin)
+        self.unit_system = unit_system
         self.vehicles: list[Vehicle] = []
+        self.location: Location | None = None
+        self.vehicle_infos: dict[str, dict[str, Any] | None] = {}
+        self.locations_supported: bool | None = None
+        self.requests_saved = 0
+        self.sections_skipped = 0
+        self.hub = ChangeHub()
 
     @property
     def is_connected(self) -> bool:
@@ -48,18 +114,49 @@ class AudiConnect:
     def uri_services(self) -> dict[str, str]:
         return self.auth.uris
 
+    def changes(
+        self, maxsize: int = CHANGES_MAXSIZE, overflow: Overflow = "drop_oldest"
+    ) -> ChangeSubscription:
+        """Return a stream of field changes of all vehicles."""
+        return self.hub.subscribe(maxsize, overflow)
+
+    def snapshot_json(self) -> bytes:
+        """Return versioned states of vehicles serialized, by VIN."""
+        return b"{%s}" % b",".join(
+            b'"%s":%s' % (vehicle.vin.encode(), vehicle.snapshot_json())
+            for vehicle in self.vehicles
+        )
+
+    def diff(self, versions: dict[str, int]) -> dict[str, dict[str, Any]]:
+        """Return JSON patches of vehicles changed since versions (by VIN)."""
+        return {
+            vehicle.vin: vehicle.diff(versions.get(vehicle.vin, 0))
+            for vehicle in self.vehicles
+            if versions.get(vehicle.vin) != vehicle.version
+        }
+
     async def async_login(self, vinlist: list[str] | None = None) -> None:
         """Login and retrieve tokens."""
         if self.is_connected:
             return
 
-        await self.auth.async_connect()
+        with start_span(
+            self.auth.tracer, "audi.login", {"audi.country": self.auth.country}
+        ):
+            await self.auth.async_connect()
+
+        if self._prewarm:
+            await self.async_prewarm()
 
         if len(self.vehicles) == 0:
             await self.async_fetch_data(vinlist=vinlist)
 
-    async def async_fetch_data(self, vinlist: list[str] | None = None) -> None:
-        """Update the state of all vehicles."""
+    async def async_prewarm(self) -> None:
+        """Open connections to service hosts concurrently."""
+        await self.auth.async_prewarm(URL_HOME_REGION_SETTER)
+
+    async def async_update_account(self) -> None:
+        """Update vehicles list, location and information of new vehicles."""
         try:
             loaded_vehicles = await self.async_get_vehicles()
             if "data" not in loaded_vehicles:
@@ -69,30 +166,230 @@ class AudiConnect:
                 f"Error to get information vehicles ({error})"
             ) from error
 
-        self.vehicles = []
+        await self.async_update_location()
+        await self.async_update_information(
+            [item["vin"] for item in loaded_vehicles["data"]]
+        )
+
+        known = {vehicle.vin: vehicle for vehicle in self.vehicles}
+        vehicles = []
         for item in loaded_vehicles["data"]:
-            try:
-                fill_region = await self._async_fill_url(item["vin"])
-            except AudiException as error:
-                raise AudiException(f"Error to fill urls ({error})") from error
-
-            vehicle = Vehicle(  # type: ignore
-                vin=item["vin"],
-                auth=self.auth,
-                spin=self._spin,
-                uris=self.uri_services,
-                fill_region=fill_region,
-            )
-
-            if vinlist is None or vehicle.vin.upper() in vinlist:
-                # Fetch data for a vehicle
+            if (vehicle := known.get(item["vin"])) is None:
                 try:
-                    await vehicle.async_update()
+                    fill_region = await self._async_fill_url(item["vin"])
                 except AudiException as error:
-                    _LOGGER.error(
-                        "Error while updating - %s - (%s)", vehicle.vin, error
+                    raise AudiException(f"Error to fill urls ({error})") from error
+
+                vehicle = Vehicle(
+                    vin=item["vin"],
+                    auth=self.auth,
+                    spin=self._spin,
+                    uris=self.uri_services,
+                    fill_region=fill_region,
+                    unit_system=self.unit_system,
+                    hub=ChangeHub(self.hub),
+                )
+            if vehicle.information is None and item["vin"] in self.vehicle_infos:
+                vehicle.information = self.vehicle_infos[item["vin"]]
+                vehicle.information_supported = vehicle.information is not None
+            vehicle.location = self.location
+            vehicle.locations_supported = self.locations_supported
+            vehicles.append(vehicle)
+        self.vehicles = vehicles
+
+    async def async_fetch_data(
+        self, vinlist: list[str] | None = None, timeout: float | None = None
+    ) -> UpdateStats:
+        """Update the state of all vehicles and return the profile of the cycle.
+
+        The timeout bounds the whole cycle, each request gets the remaining time.
+        """
+        start = time.perf_counter()
+        stats = UpdateStats()
+        with (
+            deadline(timeout),
+            collect(stats),
+            start_span(self.auth.tracer, "audi.fetch"),
+        ):
+            await self.async_update_account()
+
+            updated = failed = 0
+            self.sections_skipped = 0
+            for vehicle in self.vehicles:
+                if vinlist is None or vehicle.vin.upper() in vinlist:
+                    # Fetch data for a vehicle (subscribed sections only)
+                    plan = vehicle.update_plan()
+                    try:
+                        stats.add(await vehicle.async_update(sections=plan.sections))
+                    except AudiException as error:
+                        _LOGGER.error(
+                            "Error while updating - %s - (%s)", vehicle.vin, error
+                        )
+                        failed += 1
+                    else:
+                        self.requests_saved += plan.savings
+                        self.sections_skipped += vehicle.sections_skipped
+                        updated += 1
+
+        if (metrics := self.auth.metrics) is not None:
+            metrics.lap("poll_cycle_seconds", start)
+            metrics.inc("vehicles_updated_total", updated)
+            metrics.inc("vehicle_update_errors_total", failed)
+            metrics.inc("sections_skipped_total", self.sections_skipped)
+        stats.elapsed = time.perf_counter() - start
+        return stats
+
+    async def async_bulk_command(
+        self,
+        command: str,
+        *args: Any,
+        vins: Iterable[str] | None = None,
+        concurrency: int = BULK_CONCURRENCY,
+        **kwargs: Any,
+    ) -> BulkReport:
+        """Run a vehicle command (e.g. "async_set_lock") on several vehicles.
+
+        Commands run concurrently (at most `concurrency` at once), and each
+        waits for its own confirmation. Return the outcome by VIN.
+        """
+        if command not in COMMANDS:
+            raise ValueError(f"Unknown command: {command}")
+        vehicles = {vehicle.vin: vehicle for vehicle in self.vehicles}
+        targets = list(vehicles) if vins is None else [vin.upper() for vin in vins]
+        semaphore = asyncio.Semaphore(concurrency)
+        report = BulkReport(command)
+
+        async def run(vin: str) -> None:
+            if (vehicle := vehicles.get(vin)) is None:
+                report.add(CommandOutcome(vin, False, "Vehicle not found"))
+                return
+            async with semaphore:
+                start = time.monotonic()
+                try:
+                    await getattr(vehicle, command)(*args, **kwargs)
+                except AudiException as error:
+                    _LOGGER.error("Error while %s - %s - (%s)", command, vin, error)
+                    report.add(
+                        CommandOutcome(vin, False, str(error), time.monotonic() - start)
                     )
-            self.vehicles.append(vehicle)
+                else:
+                    report.add(
+                        CommandOutcome(vin, True, None, time.monotonic() - start)
+                    )
+
+        await asyncio.gather(*(run(vin) for vin in dict.fromkeys(targets)))
+        return report
+
+    async def async_set_lock(
+        self,
+        lock: bool,
+        vins: Iterable[str] | None = None,
+        concurrency: int = BULK_CONCURRENCY,
+    ) -> BulkReport:
+        """Lock or unlock vehicles (all if vins is None)."""
+        return await self.async_bulk_command(
+            "async_set_lock", lock, vins=vins, concurrency=concurrency
+        )
+
+    async def async_set_charger(
+        self,
+        action: bool,
+        vins: Iterable[str] | None = None,
+        concurrency: int = BULK_CONCURRENCY,
+    ) -> BulkReport:
+        """Start or stop charging of vehicles (all if vins is None)."""
+        return await self.async_bulk_command(
+            "async_set_charger", action, vins=vins, concurrency=concurrency
+        )
+
+    async def async_set_climatisation(
+        self,
+        action: bool,
+        vins: Iterable[str] | None = None,
+        concurrency: int = BULK_CONCURRENCY,
+    ) -> BulkReport:
+        """Start or stop climatisation of vehicles (all if vins is None)."""
+        return await self.async_bulk_command(
+            "async_set_climatisation", action, vins=vins, concurrency=concurrency
+        )
+
+    async def async_update_information(self, vins: list[str]) -> None:
+        """Update vehicles information not known yet, in a single request.
+
+        Vehicles without information (null alias in a reply without errors)
+        are not queried again.
+        """
+        if not (missing := [vin for vin in vins if vin not in self.vehicle_infos]):
+            return
+        try:
+            rsp = ExtendedDict(await self.async_get_information(missing))
+        except (AttributeError, AudiException) as error:
+            _LOGGER.debug("Information of vehicles failed (%s)", error)
+            return
+        data = rsp.get("data")
+        if (errors := rsp.get("errors")) or not isinstance(data, dict):
+            _LOGGER.debug("Information of vehicles failed (%s)", errors)
+            if not isinstance(data, dict):
+                return
+        for index, vin in enumerate(missing):
+            if user_vehicle := data.get(f"v{index}"):
+                self.vehicle_infos[vin] = {"data": {"userVehicle": user_vehicle}}
+            elif not errors and f"v{index}" in data:
+                self.vehicle_infos[vin] = None
+
+    async def async_get_information(self, vins: list[str]) -> Any:
+        """Get information of vehicles (one aliased query)."""
+        language = self.uri_services["language"]
+        country = self.uri_services["country"]
+        headers = await self.auth.async_get_headers(
+            token_type="audi",
+            headers={
+                "Accept-Language": f"{language}-{country}",
+                "Content-Type": "application/json",
+                "X-User-Country": country,
+            },
+        )
+        variables = ", ".join(f"$vin{index}: String!" for index in range(len(vins)))
+        fields = " ".join(
+            f"v{index}: userVehicle(vehicleCoreId: $vin{index}) {{{GRAPHQL_VEHICLE_FIELDS}}}"
+            for index in range(len(vins))
+        )
+        data = {
+            "query": f"query ({variables}) {{{fields}}}",
+            "variables": {f"vin{index}": vin for index, vin in enumerate(vins)},
+        }
+        return await self.auth.request(
+            "POST",
+            f"{self.uri_services['base_url']}/vgql/v1/graphql",
+            json=data,
+            headers=headers,
+            allow_redirects=False,
+        )
+
+    async def async_update_location(self) -> None:
+        """Update here.com locations, shared by all vehicles of the account."""
+        if self.locations_supported is False:
+            return
+        try:
+            location = await self.async_get_location()
+            self.location = Location(**location)
+            self.locations_supported = True
+        except (TypeError, ValidationError):
+            _LOGGER.warning("Locations failed: format is incorrect")
+            self.locations_supported = None
+        except TimeoutExceededError as error:
+            _LOGGER.debug(error)
+        except AudiException as error:
+            _LOGGER.debug(error)
+            self.locations_supported = False
+
+    async def async_get_location(self) -> Any:
+        """Get destination data."""
+        headers = await self.auth.async_get_headers(token_type="here")
+        data = await self.auth.request(
+            "GET", f"{self.uri_services['here_url']}/location", headers=headers
+        )
+        return data
 
     async def async_get_vehicles(self) -> Any:
         """Fetch vehicles."""
@@ -106,6 +403,14 @@ class AudiConnect:
 
     async def _async_fill_url(self, vin: str) -> NamedTuple:
         """Fill region."""
+        FillRegion = namedtuple("FillRegion", ("url", "url_setter"))
+        store = self.auth.store
+        if (
+            store is not None
+            and (region := await store.async_get("regions", vin)) is not None
+        ):
+            return FillRegion(*region)
+
         url = URL_HOME_REGION
         url_setter = URL_HOME_REGION_SETTER
         headers = await self.auth.async_get_headers(token_type="mbb")
@@ -117,14 +422,13 @@ class AudiConnect:
             url = uri.replace("mal-", "fal-").replace("/api", "/fs-car")
             url_setter = uri
 
-        FillRegion = namedtuple("FillRegion", ("url", "url_setter"))
-
+        if store is not None:
+            await store.async_set("regions", vin, [url, url_setter])
         return FillRegion(url, url_setter)
 
     async def async_close(self) -> None:
-        """Close open client (WebSocket) session."""
-        if self.auth._session:
-            await self.auth._session.close()
+        """Close managed client session (a session passed in is left open)."""
+        await self.auth.async_close()
 
     async def __aenter__(self) -> Self:
         """Async enter."""
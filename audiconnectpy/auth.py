@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import asyncio
 import base64
+from collections.abc import Callable
 from datetime import datetime, timedelta
 from hashlib import sha256
 import json
@@ -11,13 +12,22 @@ import logging
 import os
 import re
 import socket
+import time
 from typing import Any, Literal
 from urllib.parse import parse_qs, urlencode, urlparse
 import uuid
 
-from aiohttp import ClientError, ClientResponseError, ClientSession
+from aiohttp import (
+    ClientError,
+    ClientResponse,
+    ClientResponseError,
+    ClientSession,
+    ClientTimeout,
+)
 from bs4 import BeautifulSoup
 
+from .admission import LoginAdmission
+from .cache import DiscoveryCache, ResponseCache
 from .const import (
     CLIENT_IDS,
     DELAY,
@@ -25,37 +35,74 @@ from .const import (
     HDR_XAPP_VERSION,
     MARKET_URL,
     MBB_URL,
-    TIMEOUT,
+    TIMEOUT_PREWARM,
+    TIMEOUT_PROFILES,
     URL_HERE_COM,
     URL_INFO_USER,
 )
 from .exceptions import (
     AudiException,
     AuthorizationError,
+    DeadlineExceededError,
     HttpRequestError,
     ServiceNotFoundError,
     TimeoutExceededError,
 )
-from .helpers import ExtendedDict, retry
+from .hedging import HedgePolicy
+from .helpers import (
+    ExtendedDict,
+    current_lane,
+    endpoint_profile,
+    endpoint_template,
+    json_loads,
+    remaining_time,
+    retry,
+)
+from .lanes import LaneScheduler
+from .metrics import Metrics
+from .offload import Offloader
+from .session import create_session
+from .stats import current_stats
+from .store import SharedStore
+from .tracing import http_attributes, start_span
 
 _LOGGER = logging.getLogger(__name__)
 
 
+def _discard_result(task: asyncio.Future[Any]) -> None:
+    """Retrieve outcome of an abandoned request."""
+    if not task.cancelled():
+        task.exception()
+
+
 class Auth:
     """Authentication."""
 
     def __init__(
         self,
-        session: ClientSession,
+        session: ClientSession | None,
         username: str,
         password: str,
         country: str,
         model: Literal["standard", "e-tron"],
         *,
         proxy: str | None = None,
+        hedging: HedgePolicy | None = None,
+        timeouts: dict[str, float] | None = None,
+        coalesce: bool = True,
+        cache: ResponseCache | None = None,
+        lanes: LaneScheduler | None = None,
+        discovery: DiscoveryCache | None = None,
+        admission: LoginAdmission | None = None,
+        store: SharedStore | None = None,
+        offload: Offloader | None = None,
+        metrics: Metrics | None = None,
+        tracer: Any = None,
     ) -> None:
         """Initialize."""
         self._session = session
+        self.session_factory: Callable[[], ClientSession] | None = None
+        self.owns_session = False
         self._username = username
         self._password = password
         self.country = country
@@ -73,6 +120,40 @@ class Auth:
         self._audi_token: dict[str, str] = {}
         self.uris: dict[str, str] = {}
         self.binded: bool = False
+        self.hedging = hedging
+        self.timeouts = {**TIMEOUT_PROFILES, **(timeouts or {})}
+        self.coalesce = coalesce
+        self.coalesced = 0
+        self._inflight: dict[tuple[str, ...], asyncio.Future[Any]] = {}
+        self.cache = cache
+        self._revalidating: dict[tuple[str, ...], asyncio.Future[Any]] = {}
+        self.lanes = lanes
+        self.discovery = discovery
+        self.admission = admission
+        self.store = store
+        self.offload = offload
+        self.metrics = metrics
+        self.tracer = tracer
+        self.refresh_skew = 0.0
+
+    @property
+    def session(self) -> ClientSession:
+        """Return session, a managed one is created on first use.
+
+        A session created by `session_factory` (e.g. shared by a fleet) is
+        not owned.
+        """
+        if self._session is None:
+            if self.session_factory is None:
+                self._session, self.owns_session = create_session(), True
+            else:
+                self._session = self.session_factory()
+        return self._session
+
+    async def async_close(self) -> None:
+        """Close managed session."""
+        if self.owns_session and self._session is not None:
+            await self._session.close()
 
     async def request(
         self,
@@ -83,14 +164,198 @@ class Auth:
         **kwargs: Any,
     ) -> Any:
         """Request url with method."""
+        if (
+            self.cache is not None
+            and not raw_reply
+            and self.cache.ttl(endpoint_profile(url))
+        ):
+            key = self._cache_key(method, url, kwargs)
+            if (cached := self.cache.get(key)) is not None:
+                rsp, fresh = cached
+                if (stats := current_stats()) is not None:
+                    stats.cache_hits += 1
+                if not fresh:
+                    self._revalidate(key, method, url, **kwargs)
+                return rsp
+
+        return await self._async_fresh_request(
+            method, url, raw_reply, raw_rsp, **kwargs
+        )
+
+    async def _async_fresh_request(
+        self,
+        method: str,
+        url: str,
+        raw_reply: bool = False,
+        raw_rsp: bool = False,
+        **kwargs: Any,
+    ) -> Any:
+        """Request url without looking up cache."""
+        if self.coalesce and method == "GET" and not raw_reply:
+            return await self._async_coalesced_request(method, url, **kwargs)
+        return await self._async_request(method, url, raw_reply, raw_rsp, **kwargs)
+
+    def _cache_key(
+        self, method: str, url: str, kwargs: dict[str, Any]
+    ) -> tuple[str, ...]:
+        """Return cache key of request."""
+        return (
+            self._username,
+            method,
+            url,
+            repr(kwargs.get("params")),
+            repr(kwargs.get("json")),
+        )
+
+    def _revalidate(
+        self, key: tuple[str, ...], method: str, url: str, **kwargs: Any
+    ) -> None:
+        """Refresh stale cache entry in background."""
+        if key in self._revalidating:
+            return
+        _LOGGER.debug("Revalidate cache: %s (%s)", url, method)
+        task = asyncio.ensure_future(self._async_fresh_request(method, url, **kwargs))
+        self._revalidating[key] = task
+        task.add_done_callback(lambda _: self._revalidating.pop(key, None))
+        task.add_done_callback(_discard_result)
+
+    async def _async_coalesced_request(
+        self, method: str, url: str, **kwargs: Any
+    ) -> Any:
+        """Share one in-flight request between identical concurrent requests."""
+        headers = kwargs.get("headers") or {}
+        key = (
+            method,
+            url,
+            repr(kwargs.get("params")),
+            str(headers.get("Authorization")),
+        )
+        if (future := self._inflight.get(key)) is None:
+
+            def _release(future: asyncio.Future[Any]) -> None:
+                self._inflight.pop(key, None)
+                _discard_result(future)
+
+            future = asyncio.ensure_future(self._async_request(method, url, **kwargs))
+            self._inflight[key] = future
+            future.add_done_callback(_release)
+        else:
+            _LOGGER.debug("Coalesce request: %s (%s)", url, method)
+            self.coalesced += 1
+            if (stats := current_stats()) is not None:
+                stats.coalesced += 1
+        return await asyncio.shield(future)
+
+    async def _async_request(
+        self,
+        method: str,
+        url: str,
+        raw_reply: bool = False,
+        raw_rsp: bool = False,
+        **kwargs: Any,
+    ) -> Any:
+        """Send request and parse response."""
+        if self.hedging and method == "GET" and not raw_reply:
+            response, contents = await self._async_hedged_send(method, url, **kwargs)
+        else:
+            response, contents = await self._async_send(method, url, **kwargs)
+
+        if raw_reply and raw_rsp is False:
+            return response
+
+        start = time.perf_counter()
+        if "application/json" in response.headers.get("Content-Type", ""):
+            if self.offload is None:
+                rsp = await response.json()
+            else:
+                rsp = await self.offload.async_run(len(contents), json_loads, contents)
+            if (stats := current_stats()) is not None:
+                stats.decode += time.perf_counter() - start
+        elif (
+            (headers := kwargs.get("headers"))
+            and "application/json" in headers.get("Accept", "")
+            and contents == ""
+        ):
+            _LOGGER.debug("JSON FIX: Accept is JSON but Response is None")
+            rsp = {}
+        else:
+            rsp = await response.text()
+
+        if (
+            self.cache is not None
+            and not raw_reply
+            and (ttl := self.cache.ttl(endpoint_profile(url)))
+        ):
+            self.cache.set(
+                self._cache_key(method, url, kwargs), rsp, len(contents), ttl
+            )
+
+        return (response, rsp) if raw_reply and raw_rsp else rsp
+
+    async def _async_send(
+        self, method: str, url: str, **kwargs: Any
+    ) -> tuple[ClientResponse, bytes]:
+        """Send request in its priority lane."""
+        name = f"{method} {endpoint_template(url)}"
+        with start_span(self.tracer, name, http_attributes(method, url)) as span:
+            if self.lanes is None:
+                response, contents = await self._async_transmit(method, url, **kwargs)
+            else:
+                request_lane = self.request_lane(method, url)
+                # Time queued in the lane counts against the deadline
+                try:
+                    async with asyncio.timeout(remaining_time()):
+                        await self.lanes.acquire(request_lane)
+                except asyncio.TimeoutError as error:
+                    raise DeadlineExceededError(
+                        f"Deadline exceeded in {request_lane} lane before request {url}"
+                    ) from error
+                try:
+                    response, contents = await self._async_transmit(
+                        method, url, **kwargs
+                    )
+                finally:
+                    self.lanes.release()
+            if span is not None:
+                span.set_attribute("http.response.status_code", response.status)
+            return response, contents
+
+    async def _async_transmit(
+        self, method: str, url: str, **kwargs: Any
+    ) -> tuple[ClientResponse, bytes]:
+        """Send request and read body."""
+        timeout = self.request_timeout(url)
+        remaining = remaining_time()
+        start = time.monotonic()
         try:
-            async with asyncio.timeout(TIMEOUT):
+            async with asyncio.timeout(timeout):
                 _LOGGER.debug("Request - Header: %s", kwargs.get("headers"))
                 _LOGGER.debug("Request: %s (%s) - %s", url, method, kwargs.get("data"))
-                response = await self._session.request(method, url, **kwargs)
+                response = await self.session.request(method, url, **kwargs)
                 contents = await response.read()
+                if (stats := current_stats()) is not None:
+                    stats.record_request(len(contents), time.monotonic() - start)
+                if self.metrics is not None:
+                    self._record_request(method, url, str(response.status), start)
+                    self.metrics.inc(
+                        "response_bytes_total",
+                        len(contents),
+                        endpoint=endpoint_template(url),
+                    )
                 response.raise_for_status()
-        except (asyncio.CancelledError, asyncio.TimeoutError) as error:
+        except asyncio.CancelledError:
+            # Cancelled by the caller (e.g. losing hedge), not timed out
+            raise
+        except asyncio.TimeoutError as error:
+            if self.hedging and method == "GET":
+                # Time out counts as the slowest sample, not a missing one
+                self.hedging.record(endpoint_template(url), time.monotonic() - start)
+            if self.metrics is not None:
+                self._record_request(method, url, "timeout", start)
+            if remaining is not None and remaining <= timeout:
+                raise DeadlineExceededError(
+                    f"Deadline exceeded during request {url}"
+                ) from error
             raise TimeoutExceededError(
                 "Timeout occurred while connecting to Audi Connect."
             ) from error
@@ -101,33 +366,112 @@ class Auth:
                 if msg := message.get("error", {}).get("message"):
                     message = msg
             raise ServiceNotFoundError(
-                f"Service not found: {url} - {message} ({response.status})"
+                f"Service not found: {url} - {message} ({response.status})",
+                response.status,
             ) from error
         except (ClientError, socket.gaierror) as error:
+            if self.metrics is not None:
+                self._record_request(method, url, "error", start)
             raise HttpRequestError(
                 "Error occurred while communicating with Audi Connect."
             ) from error
 
+        if self.hedging and method == "GET":
+            self.hedging.record(endpoint_template(url), time.monotonic() - start)
+
         _LOGGER.debug("Response - Headers: %s", response.headers)
         _LOGGER.debug("Response: %s (%s)", contents, response.status)
         _LOGGER.debug("---------------------------------------------------------")
 
-        if raw_reply and raw_rsp is False:
-            return response
+        return response, contents
+
+    def _record_request(self, method: str, url: str, status: str, start: float) -> None:
+        """Record duration of request."""
+        assert self.metrics is not None
+        self.metrics.observe(
+            "request_seconds",
+            time.monotonic() - start,
+            endpoint=endpoint_template(url),
+            method=method,
+            status=status,
+        )
 
-        if "application/json" in response.headers.get("Content-Type", ""):
-            rsp = await response.json()
-        elif (
-            (headers := kwargs.get("headers"))
-            and "application/json" in headers.get("Accept", "")
-            and contents == ""
-        ):
-            _LOGGER.debug("JSON FIX: Accept is JSON but Response is None")
-            rsp = {}
-        else:
-            rsp = await response.text()
+    def request_lane(self, method: str, url: str) -> str:
+        """Return priority lane of request (set by context or guessed)."""
+        if (name := current_lane()) is not None:
+            return name
+        if endpoint_profile(url) == "confirmation":
+            return "confirmation"
+        return "background" if method in ("GET", "HEAD") else "interactive"
+
+    def request_timeout(self, url: str) -> float:
+        """Return timeout of url, bounded by the remaining deadline."""
+        timeout = self.timeouts.get(endpoint_profile(url), self.timeouts["default"])
+        if (remaining := remaining_time()) is not None:
+            if remaining <= 0:
+                raise DeadlineExceededError(f"Deadline exceeded before request {url}")
+            timeout = min(timeout, remaining)
+        return timeout
+
+    async def _async_hedged_send(
+        self, method: str, url: str, **kwargs: Any
+    ) -> tuple[ClientResponse, bytes]:
+        """Send request, then a second one if the first is slow; first answer wins."""
+        assert self.hedging is not None
+        delay = self.hedging.hedge_delay(endpoint_template(url))
+        if delay is None:
+            return await self._async_send(method, url, **kwargs)
+
+        primary = asyncio.ensure_future(self._async_send(method, url, **kwargs))
+        tasks = {primary}
+        try:
+            await asyncio.wait(tasks, timeout=delay)
+            if primary.done() or not self.hedging.try_acquire():
+                return await primary
+
+            _LOGGER.debug("Hedge request: %s (%s) after %.3fs", url, method, delay)
+            hedge = asyncio.ensure_future(self._async_send(method, url, **kwargs))
+            tasks.add(hedge)
+            pending = set(tasks)
+            error: BaseException | None = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if (error := task.exception()) is None:
+                        if task is hedge:
+                            self.hedging.hedge_wins += 1
+                        return task.result()
+            assert error is not None
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                    task.add_done_callback(_discard_result)
+
+    async def async_prewarm(self, *urls: str) -> None:
+        """Open connections to service hosts concurrently."""
+        hosts = {
+            f"{parsed.scheme}://{parsed.netloc}"
+            for url in (*self.uris.values(), *urls)
+            if (parsed := urlparse(str(url))).scheme == "https" and parsed.netloc
+        }
+        _LOGGER.debug("Prewarm connections: %s", hosts)
+        await asyncio.gather(*(self._async_open_connection(host) for host in hosts))
 
-        return (response, rsp) if raw_reply and raw_rsp else rsp
+    async def _async_open_connection(self, url: str) -> None:
+        """Send a lightweight request to keep a connection in pool."""
+        try:
+            async with self.session.head(
+                url,
+                allow_redirects=False,
+                timeout=ClientTimeout(total=TIMEOUT_PREWARM),
+            ):
+                pass
+        except (ClientError, socket.gaierror, asyncio.TimeoutError) as error:
+            _LOGGER.debug("Prewarm %s failed (%s)", url, error)
 
     async def async_connect(self, tries: int = 3) -> None:
         """Connect to API."""
@@ -137,16 +481,70 @@ class Auth:
             self.binded = False
             raise AudiException(f"Failed retrieve urls service ({error})") from error
 
+        if await self._async_restore_tokens():
+            _LOGGER.debug("Tokens restored from shared store")
+            self.binded = True
+            return
+
+        start = time.perf_counter()
         try:
-            await self._async_login()
+            if self.admission is None:
+                await self._async_login()
+            else:
+                await self.admission.async_login(self._async_login_flow)
             self.binded = True
         except AudiException as error:
             self.binded = False
+            if self.metrics is not None:
+                self.metrics.lap("login_seconds", start, result="error")
             raise AuthorizationError("Login to Audi service failed") from error
+        if self.metrics is not None:
+            self.metrics.lap("login_seconds", start, result="ok")
+        await self._async_save_tokens()
+
+    def _tokens(self) -> dict[str, Any] | None:
+        """Return tokens as shared with other processes."""
+        if self._mbb_token_expired is None:
+            return None
+        return {
+            "user_id": self.user_id,
+            "x_client_id": self._x_client_id,
+            "mbb": self._mbb_token,
+            "mbb_expired": self._mbb_token_expired.timestamp(),
+            "here": self._here_token,
+            "idk": self._idk_token,
+            "audi": self._audi_token,
+        }
+
+    async def _async_save_tokens(self) -> None:
+        """Share tokens with other processes."""
+        if self.store is None or (tokens := self._tokens()) is None:
+            return
+        await self.store.async_set("tokens", self._username, tokens)
+
+    async def _async_restore_tokens(self) -> bool:
+        """Load tokens shared by another process."""
+        if (
+            self.store is None
+            or (tokens := await self.store.async_get("tokens", self._username)) is None
+        ):
+            return False
+        self.user_id = tokens["user_id"]
+        self._x_client_id = tokens["x_client_id"]
+        self._mbb_token = tokens["mbb"]
+        self._mbb_token_expired = datetime.fromtimestamp(tokens["mbb_expired"])
+        self._here_token = tokens["here"]
+        self._idk_token = tokens["idk"]
+        self._audi_token = tokens["audi"]
+        return True
 
     @retry(exceptions=HttpRequestError, tries=3, delay=DELAY, logger=_LOGGER)
     async def _async_login(self) -> None:
         """Request login."""
+        await self._async_login_flow()
+
+    async def _async_login_flow(self) -> None:
+        """Run login flow."""
 
         # Generate code_challenge
         code_verifier = str(base64.urlsafe_b64encode(os.urandom(32)), "utf-8").strip(
@@ -300,44 +698,69 @@ class Auth:
         if "refresh_token" in self._here_token:
             self._mbb_token["refresh_token"] = self._here_token["refresh_token"]
 
+    def _tokens_expired(self) -> bool:
+        """Return True if tokens expire within the refresh skew."""
+        return self._mbb_token_expired is not None and (
+            datetime.now() + timedelta(seconds=self.refresh_skew)
+            > self._mbb_token_expired
+        )
+
     async def async_refresh_tokens(self) -> None:
         """Refresh token if."""
-        if self._mbb_token_expired and datetime.now() > self._mbb_token_expired:
-            try:
-                _LOGGER.debug("Refresh MBB token")
-                refresh_token = self._mbb_token["refresh_token"]
-                self._mbb_token = await self._async_get_mbb_token(
-                    refresh_token=refresh_token
-                )
-                # TR/2022-02-10: If a new refresh_token is provided, save it for further refreshes
-                if "refresh_token" not in self._mbb_token:
-                    _LOGGER.debug("refresh token not provided")
-                    self._mbb_token["refresh_token"] = refresh_token
-
-                self._mbb_token_expired = datetime.now() + timedelta(
-                    seconds=self._mbb_token["expires_in"]
-                )
-
-                _LOGGER.debug("Refresh IDK token")
-                self._idk_token = await self._async_get_idk_token(
-                    refresh_token=self._idk_token["refresh_token"]
-                )
-
-                _LOGGER.debug("Refresh Audi token")
-                self._audi_token = await self._async_get_azs_token(
-                    id_token=self._idk_token["id_token"]
-                )
-
-                _LOGGER.debug("Refresh Here token")
-                self._here_token = await self._async_get_here_token(
-                    id_token=self._idk_token["id_token"]
-                )
-                if "refresh_token" in self._here_token:
-                    self._mbb_token["refresh_token"] = self._here_token["refresh_token"]
-
-            except AudiException as error:
-                _LOGGER.error("Refresh token failed: %s", error)
-                self.binded = False
+        if self._tokens_expired():
+            # Another process may have refreshed them already
+            if await self._async_restore_tokens() and not self._tokens_expired():
+                _LOGGER.debug("Tokens refreshed by another process")
+                return
+            with start_span(self.tracer, "audi.token_refresh"):
+                failed = self._tokens()
+                start = time.perf_counter()
+                try:
+                    _LOGGER.debug("Refresh MBB token")
+                    refresh_token = self._mbb_token["refresh_token"]
+                    self._mbb_token = await self._async_get_mbb_token(
+                        refresh_token=refresh_token
+                    )
+                    # TR/2022-02-10: If a new refresh_token is provided, save it for further refreshes
+                    if "refresh_token" not in self._mbb_token:
+                        _LOGGER.debug("refresh token not provided")
+                        self._mbb_token["refresh_token"] = refresh_token
+
+                    self._mbb_token_expired = datetime.now() + timedelta(
+                        seconds=self._mbb_token["expires_in"]
+                    )
+
+                    _LOGGER.debug("Refresh IDK token")
+                    self._idk_token = await self._async_get_idk_token(
+                        refresh_token=self._idk_token["refresh_token"]
+                    )
+
+                    _LOGGER.debug("Refresh Audi token")
+                    self._audi_token = await self._async_get_azs_token(
+                        id_token=self._idk_token["id_token"]
+                    )
+
+                    _LOGGER.debug("Refresh Here token")
+                    self._here_token = await self._async_get_here_token(
+                        id_token=self._idk_token["id_token"]
+                    )
+                    if "refresh_token" in self._here_token:
+                        self._mbb_token["refresh_token"] = self._here_token[
+                            "refresh_token"
+                        ]
+
+                except AudiException as error:
+                    _LOGGER.error("Refresh token failed: %s", error)
+                    self.binded = False
+                    if self.store is not None:
+                        # Keep tokens stored meanwhile by another process
+                        await self.store.async_delete("tokens", self._username, failed)
+                    if self.metrics is not None:
+                        self.metrics.lap("token_refresh_seconds", start, result="error")
+                else:
+                    await self._async_save_tokens()
+                    if self.metrics is not None:
+                        self.metrics.lap("token_refresh_seconds", start, result="ok")
 
     async def async_get_action_headers(
         self, content_type: str, security_token: str | None, x_security: bool = False
@@ -608,6 +1031,16 @@ class Auth:
 
     async def _async_retrieve_url_service(self) -> None:
         """Get urls for request."""
+        if self.discovery is None:
+            self.uris = await self._async_discover_urls()
+        else:
+            self.uris = await self.discovery.async_get(
+                (self.country, self.model), self._async_discover_urls
+            )
+        _LOGGER.debug("Urls of service: %s", self.uris)
+
+    async def _async_discover_urls(self) -> dict[str, str]:
+        """Discover urls of services."""
         # Get markets to get language
         markets_json = await self.request("GET", f"{MARKET_URL}/markets")
 
@@ -641,7 +1074,7 @@ class Auth:
         token_endpoint_url = openid_json.get("token_endpoint", "")
         revocation_endpoint_url = openid_json.get("revocation_endpoint", "")
 
-        self.uris = {
+        return {
             "client_id": client_id,
             "audi_url": audi_url,
             "base_url": base_url,
@@ -657,5 +1090,3 @@ class Auth:
             "language": language,
             "country": self.country,
         }
-
-        _LOGGER.debug("Urls of service: %s", self.uris)
@@ -0,0 +1,132 @@
+"""Response cache."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+import logging
+import time
+from typing import Any, NamedTuple
+
+from .const import CACHE_MAX_BYTES, CACHE_STALE, CACHE_TTLS
+from .store import SharedStore
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class CacheEntry(NamedTuple):
+    """Cached response."""
+
+    value: Any
+    size: int
+    expires: float
+
+
+class ResponseCache:
+    """LRU cache of responses bounded by size, with a TTL per endpoint profile.
+
+    Expired entries are still served during `stale` seconds while the
+    caller refreshes them in background (stale-while-revalidate).
+    """
+
+    def __init__(
+        self,
+        ttls: dict[str, float] | None = None,
+        max_bytes: int = CACHE_MAX_BYTES,
+        stale: float = CACHE_STALE,
+    ) -> None:
+        """Initialize."""
+        self.ttls = {**CACHE_TTLS, **(ttls or {})}
+        self.max_bytes = max_bytes
+        self.stale = stale
+        self.size = 0
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: OrderedDict[tuple[str, ...], CacheEntry] = OrderedDict()
+
+    def __len__(self) -> int:
+        """Return number of entries."""
+        return len(self._entries)
+
+    def ttl(self, profile: str) -> float | None:
+        """Return time to live of profile (None if not cached)."""
+        return self.ttls.get(profile)
+
+    def get(self, key: tuple[str, ...]) -> tuple[Any, bool] | None:
+        """Return cached value and freshness."""
+        if (entry := self._entries.get(key)) is None:
+            self.misses += 1
+            return None
+        now = time.monotonic()
+        if now > entry.expires + self.stale:
+            self._pop(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        if now > entry.expires:
+            self.stale_hits += 1
+            return entry.value, False
+        self.hits += 1
+        return entry.value, True
+
+    def set(self, key: tuple[str, ...], value: Any, size: int, ttl: float) -> None:
+        """Store value, evicting least recently used entries."""
+        if key in self._entries:
+            self._pop(key)
+        if size > self.max_bytes:
+            _LOGGER.debug("Response too large to be cached (%s bytes)", size)
+            return
+        self._entries[key] = CacheEntry(value, size, time.monotonic() + ttl)
+        self.size += size
+        while self.size > self.max_bytes:
+            self._pop(next(iter(self._entries)))
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._entries.clear()
+        self.size = 0
+
+    def _pop(self, key: tuple[str, ...]) -> None:
+        """Remove entry."""
+        self.size -= self._entries.pop(key).size
+
+
+class DiscoveryCache:
+    """Service urls by country and model, discovered once for all accounts."""
+
+    def __init__(self, store: SharedStore | None = None) -> None:
+        """Initialize (urls are also shared with processes using the store)."""
+        self.hits = 0
+        self.misses = 0
+        self.store = store
+        self._uris: dict[tuple[str, str], dict[str, str]] = {}
+        self._locks: dict[tuple[str, str], asyncio.Lock] = {}
+
+    async def async_get(
+        self,
+        key: tuple[str, str],
+        discover: Callable[[], Awaitable[dict[str, str]]],
+    ) -> dict[str, str]:
+        """Return urls of key, discovered if unknown (once for concurrent calls)."""
+        async with self._locks.setdefault(key, asyncio.Lock()):
+            uris = self._uris.get(key)
+            if uris is None and self.store is not None:
+                uris = await self.store.async_get("discovery", ":".join(key))
+                if uris is not None:
+                    self._uris[key] = uris
+            if uris is None:
+                self.misses += 1
+                uris = self._uris[key] = await discover()
+                if self.store is not None:
+                    await self.store.async_set("discovery", ":".join(key), uris)
+            else:
+                self.hits += 1
+        return dict(uris)
+
+    def clear(self) -> None:
+        """Forget discovered urls."""
+        self._uris.clear()
@@ -0,0 +1,137 @@
+"""Change events of vehicles."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterator
+from typing import Any, Literal, NamedTuple, Self
+
+from .const import CHANGES_MAXSIZE
+
+Overflow = Literal["drop_oldest", "drop_newest", "block"]
+
+
+class ChangeEvent(NamedTuple):
+    """Change of a vehicle field."""
+
+    vin: str
+    field: str
+    old: Any
+    new: Any
+
+
+def field_changes(path: str, old: Any, new: Any) -> Iterator[tuple[str, Any, Any]]:
+    """Yield changed leaves between two dumped values (dotted paths)."""
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in old.keys() | new.keys():
+            yield from field_changes(f"{path}.{key}", old.get(key), new.get(key))
+    elif old != new:
+        yield path, old, new
+
+
+class ChangeSubscription:
+    """Bounded stream of change events.
+
+    When the buffer is full, `drop_oldest` discards the oldest event,
+    `drop_newest` discards the new one and `block` makes the publisher
+    wait (the update is slowed down until the consumer catches up).
+    """
+
+    def __init__(
+        self,
+        hub: ChangeHub,
+        maxsize: int = CHANGES_MAXSIZE,
+        overflow: Overflow = "drop_oldest",
+    ) -> None:
+        """Initialize."""
+        if overflow not in ("drop_oldest", "drop_newest", "block"):
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        self.overflow = overflow
+        self.dropped = 0
+        self.closed = False
+        self._hub = hub
+        self._queue: asyncio.Queue[ChangeEvent | None] = asyncio.Queue(maxsize)
+
+    def __aiter__(self) -> Self:
+        """Return iterator."""
+        return self
+
+    async def __anext__(self) -> ChangeEvent:
+        """Return next event."""
+        if self.closed and self._queue.empty():
+            raise StopAsyncIteration
+        if (event := await self._queue.get()) is None:
+            raise StopAsyncIteration
+        return event
+
+    async def __aenter__(self) -> Self:
+        """Async enter."""
+        return self
+
+    async def __aexit__(self, *_exc_info: object) -> None:
+        """Async exit."""
+        self.close()
+
+    def qsize(self) -> int:
+        """Return number of pending events."""
+        return self._queue.qsize()
+
+    async def put(self, event: ChangeEvent) -> None:
+        """Queue event according to the overflow policy."""
+        if self.closed:
+            return
+        if self.overflow == "block":
+            await self._queue.put(event)
+            return
+        if self._queue.full():
+            self.dropped += 1
+            if self.overflow == "drop_newest":
+                return
+            self._queue.get_nowait()
+        self._queue.put_nowait(event)
+
+    def close(self) -> None:
+        """Stop the stream, pending events are still delivered."""
+        if self.closed:
+            return
+        self.closed = True
+        self._hub.unsubscribe(self)
+        if self._queue.empty():
+            # Wake up a waiting consumer
+            self._queue.put_nowait(None)
+
+
+class ChangeHub:
+    """Publish change events to subscriptions (and to a parent hub)."""
+
+    def __init__(self, parent: ChangeHub | None = None) -> None:
+        """Initialize."""
+        self.parent = parent
+        self._subscriptions: set[ChangeSubscription] = set()
+
+    @property
+    def active(self) -> bool:
+        """Return True if someone listens to events."""
+        return bool(self._subscriptions) or (
+            self.parent is not None and self.parent.active
+        )
+
+    def subscribe(
+        self, maxsize: int = CHANGES_MAXSIZE, overflow: Overflow = "drop_oldest"
+    ) -> ChangeSubscription:
+        """Return a new subscription."""
+        subscription = ChangeSubscription(self, maxsize, overflow)
+        self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: ChangeSubscription) -> None:
+        """Remove subscription."""
+        self._subscriptions.discard(subscription)
+
+    async def publish(self, events: list[ChangeEvent]) -> None:
+        """Publish events."""
+        for subscription in list(self._subscriptions):
+            for event in events:
+                await subscription.put(event)
+        if self.parent is not None:
+            await self.parent.publish(events)
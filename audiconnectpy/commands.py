@@ -0,0 +1,125 @@
+"""Command queue of a vehicle."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import Awaitable, Callable, Coroutine
+import functools
+import inspect
+import logging
+from typing import Any, Concatenate, ParamSpec, Protocol, TypeVar
+
+from .exceptions import CommandSupersededError
+from .helpers import lane
+from .tracing import start_span
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class _Commanded(Protocol):
+    commands: CommandQueue
+
+    @property
+    def tracer(self) -> Any: ...
+
+
+_P = ParamSpec("_P")
+_S = TypeVar("_S", bound=_Commanded)
+_T = TypeVar("_T")
+
+# Names of vehicle methods decorated with command()
+COMMANDS: set[str] = set()
+
+
+class CommandQueue:
+    """Run commands of a vehicle one at a time.
+
+    A queued command is superseded by a later command of the same kind
+    (e.g. a queued lock by an unlock), its caller gets
+    CommandSupersededError.
+    """
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self.running: str | None = None
+        self.executed = 0
+        self.superseded = 0
+        self._queue: deque[tuple[str, asyncio.Future[None]]] = deque()
+
+    def __len__(self) -> int:
+        """Return number of queued commands."""
+        return len(self._queue)
+
+    async def run(self, kind: str, command: Callable[[], Awaitable[_T]]) -> _T:
+        """Run command after the previous ones."""
+        for queued in [queued for queued in self._queue if queued[0] == kind]:
+            self._queue.remove(queued)
+            if not queued[1].done():
+                self.superseded += 1
+                queued[1].set_exception(
+                    CommandSupersededError(f"Command {kind} superseded by a later one")
+                )
+
+        if self.running is not None:
+            turn = asyncio.get_running_loop().create_future()
+            self._queue.append((kind, turn))
+            try:
+                await turn
+            except asyncio.CancelledError:
+                if turn.done() and not turn.cancelled():
+                    # Turn given while cancelled
+                    self._next()
+                elif (kind, turn) in self._queue:
+                    self._queue.remove((kind, turn))
+                raise
+
+        self.running = kind
+        try:
+            return await command()
+        finally:
+            self.executed += 1
+            self._next()
+
+    def _next(self) -> None:
+        """Give turn to the next command."""
+        self.running = None
+        while self._queue:
+            kind, turn = self._queue.popleft()
+            if not turn.done():
+                self.running = kind
+                turn.set_result(None)
+                return
+
+
+def command(
+    kind: str,
+) -> Callable[
+    [Callable[Concatenate[_S, _P], Coroutine[Any, Any, _T]]],
+    Callable[Concatenate[_S, _P], Coroutine[Any, Any, _T]],
+]:
+    """Run vehicle method in its command queue, in the interactive lane.
+
+    Kind may use arguments of the method (e.g. "timer_{timer_id}").
+    """
+
+    def decorator(
+        func: Callable[Concatenate[_S, _P], Coroutine[Any, Any, _T]],
+    ) -> Callable[Concatenate[_S, _P], Coroutine[Any, Any, _T]]:
+        """Add decorator."""
+        signature = inspect.signature(func)
+        COMMANDS.add(func.__name__)
+
+        @functools.wraps(func)
+        async def newfn(self: _S, /, *args: _P.args, **kwargs: _P.kwargs) -> _T:
+            """Load function."""
+            key = kind.format_map(signature.bind(self, *args, **kwargs).arguments)
+            with (
+                lane("interactive"),
+                start_span(self.tracer, "audi.action", {"audi.action": key}),
+            ):
+                return await self.commands.run(key, lambda: func(self, *args, **kwargs))
+
+        return newfn
+
+    return decorator
@@ -1,23 +1,86 @@
 """Constants."""
 
 BRAND = "Audi"
+BULK_CONCURRENCY = 10
+CACHE_MAX_BYTES = 4 * 1024 * 1024
+CACHE_STALE = 300
+CACHE_TTLS = {
+    "vehicles": 3600,
+    "capabilities": 3600,
+    "graphql": 86400,
+    "location": 900,
+}
+CHANGES_MAXSIZE = 1000
 CLIENT_IDS = {
     "standard": "09b6cbec-cd19-4589-82fd-363dfa8c24da@apps_vw-dilab_com",
     "e-tron": "f4d0934f-32bf-4ce4-b3c4-699a7049ad26@apps_vw-dilab_com",
 }
 DELAY = 10
 FAILED = "failed"
+FLEET_REFRESH_SPREAD = 600
+FLEET_STAGGER = 0.5
+GRAPHQL_VEHICLE_FIELDS = 'vehicle {core {modelYear} classification {modelRange} media {shortName longName} renderPictures(mediaTypes: "MYAPN1NB") { mediaType url}}'
 HDR_USER_AGENT = "Android/4.24.2 (Build 800240338.root project 'onetouch-android'.ext.buildTime) Android/11"
 HDR_XAPP_VERSION = "4.24.2"
+HEDGE_BUDGET_BURST = 5
+HEDGE_BUDGET_RATIO = 0.1
+HEDGE_MIN_DELAY = 0.05
+HEDGE_MIN_SAMPLES = 20
+HEDGE_PERCENTILE = 95
+HEDGE_WINDOW = 200
+LANE_CONCURRENCY = 8
+LANE_WEIGHTS = {"interactive": 8, "confirmation": 4, "background": 1}
+LOGIN_BACKOFF = 2
+LOGIN_BACKOFF_MAX = 300
+LOGIN_CONCURRENCY = 4
+LOGIN_TRIES = 3
+LOOP_LAG_INTERVAL = 0.5
 MARKET_URL = "https://content.app.my.audi.com/service/mobileapp/configurations"
 MAX_RESPONSE_ATTEMPTS = 10
 MBB_URL = "https://mbboauth-1d.prd.ece.vwg-connect.com/mbbcoauth"
+METRICS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+METRICS_HOST = "127.0.0.1"
+METRICS_NAMESPACE = "audiconnect"
+METRICS_PORT = 9464
+OFFLOAD_THRESHOLD = 65536
+POLL_ACCOUNT = 1800
+POLL_ACTIVE = 300
+POLL_BURST = 20
+POLL_CADENCE_SAMPLES = 10
+POLL_IDLE = 1800
+POLL_JITTER = 0.1
+POLL_MAX = 3600
+POLL_MIN = 60
+POLL_MOVING = 120
 REQUEST_FAILED = "request_failed"
 REQUEST_STATUS_SLEEP = 10
 REQUEST_SUCCESSFUL = "request_successful"
+SESSION_DNS_TTL = 300
+SESSION_KEEPALIVE = 60
+SESSION_LIMIT = 100
+SESSION_LIMIT_PER_HOST = 10
+SHARD_COUNT = 64
+SHARD_HEARTBEAT = 10
+SHARD_TTL = 30
+SNAPSHOT_HISTORY = 10
 SUCCEEDED = "succeeded"
 SUCCESSFUL = "successful"
 TIMEOUT = 120
+TIMEOUT_PREWARM = 10
+TIMEOUT_PROFILES = {
+    "token": 30,
+    "discovery": 30,
+    "graphql": 30,
+    "vehicles": 45,
+    "capabilities": 45,
+    "status": 45,
+    "location": 60,
+    "confirmation": 30,
+    "default": TIMEOUT,
+}
+TRACE_SPANS = 1000
+UPDATE_ENDPOINTS = ("capabilities", "infos", "selectivestatus", "position", "trips")
+UPDATE_SECTIONS = ("capabilities", "infos", "position", "trips")
 URL_HOME_REGION = "https://msg.volkswagen.de/fs-car"
 URL_HOME_REGION_SETTER = "https://mal-1a.prd.ece.vwg-connect.com/api"
 URL_INFO_VEHICLE = "https://app-api.live-my.audi.com/vgql/v1/graphql"
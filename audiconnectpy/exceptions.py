@@ -17,5 +17,18 @@ class TimeoutExceededError(AudiException):
     """Timeout exceeded."""
 
 
+class DeadlineExceededError(TimeoutExceededError):
+    """Deadline exceeded."""
+
+
 class ServiceNotFoundError(AudiException):
     """Service not found."""
+
+    def __init__(self, message: str, status: int | None = None) -> None:
+        """Initialize with HTTP status of the response."""
+        super().__init__(message)
+        self.status = status
+
+
+class CommandSupersededError(AudiException):
+    """Command superseded by a later one before being sent."""
@@ -0,0 +1,131 @@
+"""Prometheus exporter of metrics."""
+
+from __future__ import annotations
+
+import logging
+from typing import Self
+
+from aiohttp import web
+
+from .const import METRICS_HOST, METRICS_NAMESPACE, METRICS_PORT
+from .metrics import Labels, Metrics
+
+_LOGGER = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+HELP = {
+    "confirmation_poll_seconds": "Duration of action status polls.",
+    "login_seconds": "Duration of logins.",
+    "loop_lag_seconds": "Lag of the event loop.",
+    "poll_cycle_seconds": "Duration of vehicles update cycles.",
+    "request_seconds": "Duration of requests by endpoint.",
+    "response_bytes_total": "Bytes received by endpoint.",
+    "sections_skipped_total": "Sections not loaded again because unchanged.",
+    "token_refresh_seconds": "Duration of token refreshes.",
+    "update_phase_seconds": "Duration of vehicle update phases.",
+    "vehicle_update_errors_total": "Vehicle updates failed.",
+    "vehicles_updated_total": "Vehicles updated.",
+}
+
+
+def _escape(value: str) -> str:
+    """Escape label value."""
+    return value.replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def _labels(labels: Labels, *extra: tuple[str, str]) -> str:
+    """Return labels of a sample."""
+    pairs = [*labels, *extra]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+def _number(value: float) -> str:
+    """Return sample value."""
+    return "+Inf" if value == float("inf") else repr(float(value))
+
+
+def render_prometheus(metrics: Metrics, namespace: str = METRICS_NAMESPACE) -> str:
+    """Return metrics in Prometheus text format."""
+    lines = []
+    for name, counter in sorted(metrics.counters.items()):
+        metric = f"{namespace}_{name}"
+        if help_text := HELP.get(name):
+            lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} counter")
+        for labels, value in sorted(counter.items()):
+            lines.append(f"{metric}{_labels(labels)} {_number(value)}")
+    for name, histograms in sorted(metrics.histograms.items()):
+        metric = f"{namespace}_{name}"
+        if help_text := HELP.get(name):
+            lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} histogram")
+        for labels, histogram in sorted(histograms.items()):
+            cumulative = 0
+            bounds = [*histogram.buckets, float("inf")]
+            for bound, count in zip(bounds, histogram.counts):
+                cumulative += count
+                le = _labels(labels, ("le", _number(bound)))
+                lines.append(f"{metric}_bucket{le} {cumulative}")
+            lines.append(f"{metric}_sum{_labels(labels)} {_number(histogram.sum)}")
+            lines.append(f"{metric}_count{_labels(labels)} {histogram.count}")
+    return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """Local HTTP endpoint serving metrics to Prometheus (/metrics)."""
+
+    def __init__(
+        self,
+        metrics: Metrics,
+        host: str = METRICS_HOST,
+        port: int = METRICS_PORT,
+        namespace: str = METRICS_NAMESPACE,
+    ) -> None:
+        """Initialize (port 0 picks a free port)."""
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+        self.namespace = namespace
+        self._runner: web.AppRunner | None = None
+
+    @property
+    def url(self) -> str:
+        """Return url of metrics."""
+        return f"http://{self.host}:{self.port}/metrics"
+
+    async def _async_handle(self, _request: web.Request) -> web.Response:
+        """Serve metrics."""
+        return web.Response(
+            body=render_prometheus(self.metrics, self.namespace).encode(),
+            headers={"Content-Type": CONTENT_TYPE},
+        )
+
+    async def async_start(self) -> None:
+        """Start serving."""
+        app = web.Application()
+        app.router.add_get("/metrics", self._async_handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        if self.port == 0 and self._runner.addresses:
+            self.port = self._runner.addresses[0][1]
+        _LOGGER.debug("Serve metrics on %s", self.url)
+
+    async def async_stop(self) -> None:
+        """Stop serving."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> Self:
+        """Async enter."""
+        await self.async_start()
+        return self
+
+    async def __aexit__(self, *_exc_info: object) -> None:
+        """Async exit."""
+        await self.async_stop()
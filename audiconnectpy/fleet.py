@@ -0,0 +1,52 @@
+"""Outcome of commands sent to several vehicles."""
+
+from __future__ import annotations
+
+from typing import NamedTuple
+
+
+class CommandOutcome(NamedTuple):
+    """Outcome of a command for a vehicle."""
+
+    vin: str
+    success: bool
+    error: str | None = None
+    elapsed: float = 0
+
+
+class BulkReport:
+    """Outcome of a command by VIN."""
+
+    def __init__(self, command: str) -> None:
+        """Initialize."""
+        self.command = command
+        self.outcomes: dict[str, CommandOutcome] = {}
+
+    def __len__(self) -> int:
+        """Return number of vehicles."""
+        return len(self.outcomes)
+
+    def __getitem__(self, vin: str) -> CommandOutcome:
+        """Return outcome of vehicle."""
+        return self.outcomes[vin]
+
+    def __repr__(self) -> str:
+        """Return representation."""
+        return (
+            f"BulkReport({self.command}: {len(self.succeeded)} succeeded, "
+            f"{len(self.failed)} failed)"
+        )
+
+    @property
+    def succeeded(self) -> list[str]:
+        """Return VINs where the command succeeded."""
+        return [vin for vin, outcome in self.outcomes.items() if outcome.success]
+
+    @property
+    def failed(self) -> list[str]:
+        """Return VINs where the command failed."""
+        return [vin for vin, outcome in self.outcomes.items() if not outcome.success]
+
+    def add(self, outcome: CommandOutcome) -> None:
+        """Add outcome of a vehicle."""
+        self.outcomes[outcome.vin] = outcome
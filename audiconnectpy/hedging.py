@@ -0,0 +1,104 @@
+"""Hedged requests."""
+
+from __future__ import annotations
+
+from collections import deque
+import logging
+
+from .const import (
+    HEDGE_BUDGET_BURST,
+    HEDGE_BUDGET_RATIO,
+    HEDGE_MIN_DELAY,
+    HEDGE_MIN_SAMPLES,
+    HEDGE_PERCENTILE,
+    HEDGE_WINDOW,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class LatencyTracker:
+    """Sliding window of response times per endpoint."""
+
+    def __init__(self, window: int = HEDGE_WINDOW) -> None:
+        """Initialize."""
+        self._window = window
+        self._samples: dict[str, deque[float]] = {}
+
+    def record(self, endpoint: str, elapsed: float) -> None:
+        """Record response time of endpoint."""
+        if (samples := self._samples.get(endpoint)) is None:
+            samples = self._samples[endpoint] = deque(maxlen=self._window)
+        samples.append(elapsed)
+
+    def count(self, endpoint: str) -> int:
+        """Return number of samples of endpoint."""
+        return len(self._samples.get(endpoint, ()))
+
+    def percentile(self, endpoint: str, percentile: float) -> float | None:
+        """Return percentile of response times (nearest rank)."""
+        if not (samples := self._samples.get(endpoint)):
+            return None
+        ordered = sorted(samples)
+        rank = round(percentile / 100 * (len(ordered) - 1))
+        return ordered[min(max(rank, 0), len(ordered) - 1)]
+
+
+class HedgePolicy:
+    """Hedge idempotent requests slower than a percentile of their endpoint.
+
+    Every eligible request credits `budget_ratio` token to a shared bucket
+    (capped to `burst`), every hedge spends one token: extra load never
+    exceeds `budget_ratio` of the traffic. Share one policy between
+    several accounts to get a global budget.
+    """
+
+    def __init__(
+        self,
+        percentile: float = HEDGE_PERCENTILE,
+        budget_ratio: float = HEDGE_BUDGET_RATIO,
+        burst: float = HEDGE_BUDGET_BURST,
+        min_samples: int = HEDGE_MIN_SAMPLES,
+        min_delay: float = HEDGE_MIN_DELAY,
+        max_delay: float | None = None,
+        window: int = HEDGE_WINDOW,
+    ) -> None:
+        """Initialize."""
+        if not 0 < percentile < 100:
+            raise ValueError("percentile must be between 0 and 100")
+        self.percentile = percentile
+        self.budget_ratio = budget_ratio
+        self.burst = burst
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.latencies = LatencyTracker(window)
+        self.hedged = 0
+        self.hedge_wins = 0
+        self._tokens = burst
+
+    def record(self, endpoint: str, elapsed: float) -> None:
+        """Record response time of endpoint."""
+        self.latencies.record(endpoint, elapsed)
+
+    def hedge_delay(self, endpoint: str) -> float | None:
+        """Credit the budget and return delay before hedging (None to not hedge)."""
+        self._tokens = min(self.burst, self._tokens + self.budget_ratio)
+        if self.latencies.count(endpoint) < self.min_samples:
+            return None
+        delay = max(
+            self.latencies.percentile(endpoint, self.percentile) or 0,
+            self.min_delay,
+        )
+        if self.max_delay is not None:
+            delay = min(delay, self.max_delay)
+        return delay
+
+    def try_acquire(self) -> bool:
+        """Spend one token from budget if available."""
+        if self._tokens < 1:
+            _LOGGER.debug("Hedge budget exhausted")
+            return False
+        self._tokens -= 1
+        self.hedged += 1
+        return True
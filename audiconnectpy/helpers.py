@@ -3,15 +3,20 @@
 from __future__ import annotations
 
 import asyncio
-from collections.abc import Callable
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime
 import functools
 from functools import reduce
 from hashlib import sha512
+import json
 import logging
 import random
 import re
+import time
 from typing import Any
+from urllib.parse import urlparse
 
 from pydantic import SerializationInfo
 
@@ -19,6 +24,24 @@ from .exceptions import TimeoutExceededError
 
 _LOGGER = logging.getLogger(__name__)
 
+RE_VIN = re.compile(r"(?<=/)[A-HJ-NPR-Z0-9]{17}(?=/|$)")
+RE_IDENTIFIER = re.compile(
+    r"(?<=/)(?:[0-9a-fA-F]{8}-[0-9a-fA-F-]{27}|[0-9a-fA-F]{24,}|\d+)(?=/|$)"
+)
+ENDPOINT_PROFILES = (
+    ("token", re.compile(r"/token$")),
+    ("discovery", re.compile(r"/mobileapp/configurations/|/openid-configuration$")),
+    ("graphql", re.compile(r"/graphql$")),
+    ("location", re.compile(r"/api/v1/location$")),
+    ("confirmation", re.compile(r"/pendingrequests$|/status$|/actions/\{id\}$")),
+    ("vehicles", re.compile(r"/vehicle/v2/vehicles$")),
+    ("capabilities", re.compile(r"/capabilities$")),
+    ("status", re.compile(r"/selectivestatus$|/parkingposition$")),
+)
+
+_DEADLINE: ContextVar[float | None] = ContextVar("deadline", default=None)
+_LANE: ContextVar[str | None] = ContextVar("lane", default=None)
+
 
 class ExtendedDict(dict[Any, Any]):
     """Extend dictionary class."""
@@ -174,6 +197,69 @@ def lights_status(
     return state_control(value, "on")
 
 
+def endpoint_template(url: str) -> str:
+    """Return host and path of url with identifiers replaced by placeholders."""
+    parsed = urlparse(str(url))
+    path = RE_VIN.sub("{vin}", parsed.path)
+    path = RE_IDENTIFIER.sub("{id}", path)
+    return f"{parsed.netloc}{path}"
+
+
+def endpoint_profile(url: str) -> str:
+    """Return profile name of url (timeouts, caching)."""
+    path = endpoint_template(url)
+    for profile, pattern in ENDPOINT_PROFILES:
+        if pattern.search(path):
+            return profile
+    return "default"
+
+
+@contextmanager
+def deadline(timeout: float | None) -> Iterator[None]:
+    """Bound duration of requests sent within the context.
+
+    Nested deadlines never extend the enclosing one.
+    """
+    if timeout is None:
+        yield
+        return
+    when = time.monotonic() + timeout
+    if (current := _DEADLINE.get()) is not None:
+        when = min(when, current)
+    token = _DEADLINE.set(when)
+    try:
+        yield
+    finally:
+        _DEADLINE.reset(token)
+
+
+def remaining_time() -> float | None:
+    """Return seconds left before deadline (None if unbounded)."""
+    if (when := _DEADLINE.get()) is None:
+        return None
+    return when - time.monotonic()
+
+
+@contextmanager
+def lane(name: str) -> Iterator[None]:
+    """Send requests within the context in a priority lane."""
+    token = _LANE.set(name)
+    try:
+        yield
+    finally:
+        _LANE.reset(token)
+
+
+def current_lane() -> str | None:
+    """Return lane set by the context (None if not set)."""
+    return _LANE.get()
+
+
+def json_loads(data: bytes) -> Any:
+    """Decode JSON body (None when empty, as aiohttp does)."""
+    return json.loads(data) if data.strip() else None
+
+
 def camel2snake(name: str) -> str:
     """Camel case to Snake case."""
     return re.sub(r"(?<=[a-z])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])", "_", name).lower()
@@ -0,0 +1,127 @@
+"""Priority lanes of requests."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+import logging
+import time
+
+from .const import LANE_CONCURRENCY, LANE_WEIGHTS
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class LaneStats:
+    """Queue depth and wait time of a lane."""
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self.depth = 0
+        self.max_depth = 0
+        self.served = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    @property
+    def wait_avg(self) -> float:
+        """Return average wait time."""
+        return self.wait_total / self.served if self.served else 0.0
+
+    def record(self, wait: float) -> None:
+        """Record wait time of a served request."""
+        self.served += 1
+        self.wait_total += wait
+        self.wait_max = max(self.wait_max, wait)
+
+
+class LaneScheduler:
+    """Bound requests in flight and serve queued ones by weighted fair queuing.
+
+    Each queued request gets a virtual finish tag increased by 1/weight of
+    its lane: a lane with weight 8 is served 8 times as often as a lane
+    with weight 1 when both are backlogged, and an idle lane is served as
+    soon as a slot is free. Share one scheduler between accounts to bound
+    the whole connection pool.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = LANE_CONCURRENCY,
+        weights: dict[str, float] | None = None,
+    ) -> None:
+        """Initialize."""
+        self.concurrency = concurrency
+        self.weights = {**LANE_WEIGHTS, **(weights or {})}
+        self.active = 0
+        self.lanes = {name: LaneStats() for name in self.weights}
+        self._waiters: dict[str, deque[tuple[float, asyncio.Future[None]]]] = {
+            name: deque() for name in self.weights
+        }
+        self._finish = dict.fromkeys(self.weights, 0.0)
+        self._virtual = 0.0
+
+    def _tag(self, lane: str) -> float:
+        """Return virtual finish tag of a new request of lane."""
+        self._finish[lane] = (
+            max(self._virtual, self._finish[lane]) + 1 / self.weights[lane]
+        )
+        return self._finish[lane]
+
+    async def acquire(self, lane: str) -> None:
+        """Wait for a slot in lane."""
+        if lane not in self.weights:
+            raise ValueError(f"Unknown lane: {lane}")
+        stats = self.lanes[lane]
+        tag = self._tag(lane)
+        if self.active < self.concurrency and not any(self._waiters.values()):
+            self.active += 1
+            self._virtual = tag
+            stats.record(0)
+            return
+
+        start = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        self._waiters[lane].append((tag, future))
+        stats.depth += 1
+        stats.max_depth = max(stats.max_depth, stats.depth)
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Slot granted while cancelled
+                self.release()
+            raise
+        finally:
+            stats.depth -= 1
+        stats.record(time.monotonic() - start)
+
+    def release(self) -> None:
+        """Free a slot and wake up the next request."""
+        self.active -= 1
+        while self.active < self.concurrency:
+            queued = [
+                (waiters[0][0], name)
+                for name, waiters in self._waiters.items()
+                if waiters
+            ]
+            if not queued:
+                return
+            tag, name = min(queued)
+            _, future = self._waiters[name].popleft()
+            if future.done():
+                continue
+            self._virtual = tag
+            self.active += 1
+            future.set_result(None)
+
+    @asynccontextmanager
+    async def slot(self, lane: str) -> AsyncIterator[None]:
+        """Hold a slot in lane."""
+        await self.acquire(lane)
+        try:
+            yield
+        finally:
+            self.release()
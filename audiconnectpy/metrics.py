@@ -0,0 +1,128 @@
+"""Instrumentation of requests, token refresh, updates and event loop."""
+
+from __future__ import annotations
+
+import asyncio
+from bisect import bisect_left
+from collections.abc import Callable
+import time
+from typing import Self
+
+from .const import LOOP_LAG_INTERVAL, METRICS_BUCKETS
+
+Labels = tuple[tuple[str, str], ...]
+Listener = Callable[[str, float, dict[str, str]], None]
+
+
+class Histogram:
+    """Distribution of observed values."""
+
+    def __init__(self, buckets: tuple[float, ...] = METRICS_BUCKETS) -> None:
+        """Initialize."""
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    @property
+    def avg(self) -> float:
+        """Return average value."""
+        return self.sum / self.count if self.count else 0.0
+
+    def observe(self, value: float) -> None:
+        """Record value."""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+
+class Metrics:
+    """Registry of counters and timings, forwarded to listeners.
+
+    Components only instrument themselves when given a registry, so the
+    cost is a `None` check when disabled.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = METRICS_BUCKETS) -> None:
+        """Initialize."""
+        self.buckets = buckets
+        self.counters: dict[str, dict[Labels, float]] = {}
+        self.histograms: dict[str, dict[Labels, Histogram]] = {}
+        self._listeners: list[Listener] = []
+
+    def add_listener(self, listener: Listener) -> Callable[[], None]:
+        """Call listener(name, value, labels) on each record, return remover."""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        """Increase counter."""
+        counter = self.counters.setdefault(name, {})
+        key = tuple(sorted(labels.items()))
+        counter[key] = counter.get(key, 0) + value
+        for listener in self._listeners:
+            listener(name, value, labels)
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        """Record a value (seconds for timings)."""
+        histograms = self.histograms.setdefault(name, {})
+        key = tuple(sorted(labels.items()))
+        if (histogram := histograms.get(key)) is None:
+            histogram = histograms[key] = Histogram(self.buckets)
+        histogram.observe(value)
+        for listener in self._listeners:
+            listener(name, value, labels)
+
+    def lap(self, name: str, since: float, **labels: str) -> float:
+        """Record time elapsed since a perf_counter value and return now."""
+        now = time.perf_counter()
+        self.observe(name, now - since, **labels)
+        return now
+
+    def counter(self, name: str, **labels: str) -> float:
+        """Return value of counter."""
+        return self.counters.get(name, {}).get(tuple(sorted(labels.items())), 0)
+
+    def histogram(self, name: str, **labels: str) -> Histogram | None:
+        """Return histogram of values."""
+        return self.histograms.get(name, {}).get(tuple(sorted(labels.items())))
+
+
+class LoopLagProbe:
+    """Measure how late the event loop wakes up a sleep."""
+
+    def __init__(self, metrics: Metrics, interval: float = LOOP_LAG_INTERVAL) -> None:
+        """Initialize."""
+        self.metrics = metrics
+        self.interval = interval
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self) -> None:
+        """Start probing."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._async_probe())
+
+    def stop(self) -> None:
+        """Stop probing."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _async_probe(self) -> None:
+        """Record lag of each wake up."""
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - start - self.interval)
+            self.metrics.observe("loop_lag_seconds", lag)
+
+    async def __aenter__(self) -> Self:
+        """Async enter."""
+        self.start()
+        return self
+
+    async def __aexit__(self, *_exc_info: object) -> None:
+        """Async exit."""
+        self.stop()
@@ -379,10 +379,11 @@ class DepartureProfilesStatus(Base):
 class Model(Base):
     """Vehicle."""
 
-    last_access: datetime = Field(
+    last_access: datetime | None = Field(
+        default=None,
         validation_alias=AliasPath(
             "access", "accessStatus", "value", "carCapturedTimestamp"
-        )
+        ),
     )
     last_update: datetime = datetime.now()
     user_capabilities: UserCapabilities | None = None
@@ -396,7 +397,6 @@ class Model(Base):
     vehicle_health_inspection: VehicleHealthInspection | None = None
     measurements: Measurements | None = None
     vehicle_health_warnings: VehicleHealthWarnings | None = None
-    location: Location | None = None
     position: Position | None = None
     infos: Information | None = None
     departure_profiles: DepartureProfiles | None = None
@@ -0,0 +1,45 @@
+"""Offload of CPU bound work on large payloads."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import Executor
+import logging
+from typing import Any, TypeVar
+
+from .const import OFFLOAD_THRESHOLD
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+
+class Offloader:
+    """Run decoding and validation of payloads above a size in an executor.
+
+    Without executor, the default thread pool of the loop is used: the work
+    still holds the GIL, but the loop is scheduled between its slices. A
+    ProcessPoolExecutor runs it in parallel at the cost of pickling.
+    """
+
+    def __init__(
+        self, threshold: int = OFFLOAD_THRESHOLD, executor: Executor | None = None
+    ) -> None:
+        """Initialize."""
+        self.threshold = threshold
+        self.executor = executor
+        self.inline = 0
+        self.offloaded = 0
+        self.offloaded_bytes = 0
+
+    async def async_run(self, size: int, func: Callable[..., _T], *args: Any) -> _T:
+        """Return func(*args), run in the executor when size exceeds threshold."""
+        if size < self.threshold:
+            self.inline += 1
+            return func(*args)
+        self.offloaded += 1
+        self.offloaded_bytes += size
+        _LOGGER.debug("Offload %s (%s bytes)", getattr(func, "__name__", func), size)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
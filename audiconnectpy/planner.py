@@ -0,0 +1,76 @@
+"""Update planner for field subscriptions."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from typing import NamedTuple
+
+from pydantic.alias_generators import to_camel
+
+from .const import UPDATE_SECTIONS
+from .model import Model
+
+# Vehicle attributes filled by another section
+FIELD_SECTIONS = {
+    "last_access": "access",
+    "is_moving": "position",
+    "position_supported": "position",
+    "capabilities_supported": "capabilities",
+    "trips_supported": "trips",
+}
+SECTIONS = (set(Model.model_fields) | set(UPDATE_SECTIONS)) - {"last_update"}
+JOB_SECTIONS = set(Model.model_fields) - {
+    "last_access",
+    "last_update",
+    "position",
+    "infos",
+}
+
+
+class UpdatePlan(NamedTuple):
+    """Sections to update and requests needed."""
+
+    sections: frozenset[str] | None
+    jobs: tuple[str, ...]
+    requests: int
+    full_requests: int
+
+    @property
+    def savings(self) -> int:
+        """Return requests saved compared with a full update."""
+        return self.full_requests - self.requests
+
+
+def field_section(field: str) -> str:
+    """Return section filling a field path (e.g. charging.battery_status)."""
+    root = field.split(".", 1)[0]
+    section = FIELD_SECTIONS.get(root, root)
+    if section not in SECTIONS:
+        raise ValueError(f"Unknown field: {field}")
+    return section
+
+
+def plan_update(
+    fields: Iterable[str] | None,
+    capabilities_supported: bool | None = None,
+    position_supported: bool | None = None,
+    information_known: bool = False,
+) -> UpdatePlan:
+    """Return the smallest update covering fields (full update if None)."""
+    optional = {
+        "capabilities": capabilities_supported is not False,
+        "infos": not information_known,
+        "position": position_supported is not False,
+        "trips": True,
+    }
+    # userCapabilities discovery + status jobs
+    full_requests = 2 + sum(optional.values())
+    if fields is None:
+        return UpdatePlan(None, (), full_requests, full_requests)
+
+    sections = frozenset(field_section(field) for field in fields)
+    jobs = tuple(sorted(to_camel(name) for name in sections & JOB_SECTIONS))
+    requests = (1 if jobs else 0) + sum(
+        needed for name, needed in optional.items() if name in sections
+    )
+    return UpdatePlan(sections, jobs, requests, full_requests)
@@ -0,0 +1,206 @@
+"""Adaptive polling of vehicles."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from datetime import datetime
+import logging
+from random import uniform
+from statistics import median
+import time
+
+from .api import AudiConnect
+from .const import (
+    POLL_ACCOUNT,
+    POLL_ACTIVE,
+    POLL_BURST,
+    POLL_CADENCE_SAMPLES,
+    POLL_IDLE,
+    POLL_JITTER,
+    POLL_MAX,
+    POLL_MIN,
+    POLL_MOVING,
+)
+from .exceptions import AudiException
+from .helpers import ExtendedDict
+from .vehicle import Vehicle
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class RequestBudget:
+    """Token bucket of requests per hour, share it to get a global budget."""
+
+    def __init__(self, rate: float, burst: float = POLL_BURST) -> None:
+        """Initialize."""
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+
+    def acquire(self, cost: float) -> float:
+        """Spend cost and return 0, or return seconds to wait for enough tokens."""
+        now = time.monotonic()
+        self._tokens = min(
+            self.burst, self._tokens + (now - self._updated) * self.rate / 3600
+        )
+        self._updated = now
+        if self._tokens >= cost:
+            self._tokens -= cost
+            return 0
+        return (cost - self._tokens) * 3600 / self.rate
+
+
+class PollScheduler:
+    """Poll each vehicle at a rate adapted to its state.
+
+    Moving vehicles are polled every `moving` seconds, charging or
+    climatising ones every `active` seconds and others every `idle`
+    seconds, never faster than the vehicle reports in its current state
+    (observed cadence of its last access). Intervals are jittered to avoid
+    bursts, and polls wait when the request budget is exhausted.
+
+    Account data (vehicles list, location and information of new
+    vehicles) is refreshed every `account` seconds.
+    """
+
+    def __init__(
+        self,
+        connect: AudiConnect,
+        *,
+        moving: float = POLL_MOVING,
+        active: float = POLL_ACTIVE,
+        idle: float = POLL_IDLE,
+        min_interval: float = POLL_MIN,
+        max_interval: float = POLL_MAX,
+        jitter: float = POLL_JITTER,
+        budget: RequestBudget | None = None,
+        account: float = POLL_ACCOUNT,
+    ) -> None:
+        """Initialize."""
+        self.connect = connect
+        self.moving = moving
+        self.active = active
+        self.idle = idle
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.jitter = jitter
+        self.budget = budget
+        self.account = account
+        self.next_account = time.monotonic() + account if connect.vehicles else 0.0
+        self.next_poll: dict[str, float] = {}
+        self.polls = 0
+        self.deferred = 0
+        self._reports: dict[str, tuple[str, datetime, deque[float]]] = {}
+
+    def cadence(self, vin: str) -> float | None:
+        """Return observed interval between two reports of a vehicle."""
+        if (report := self._reports.get(vin)) is None or not report[2]:
+            return None
+        return median(report[2])
+
+    def observe(self, vehicle: Vehicle) -> None:
+        """Record last access reported by vehicle.
+
+        Cadence is observed again from scratch when the state changes.
+        """
+        if (last_access := vehicle.last_access) is None:
+            return
+        state = self.state(vehicle)
+        if (report := self._reports.get(vehicle.vin)) is None or report[0] != state:
+            self._reports[vehicle.vin] = (
+                state,
+                last_access,
+                deque(maxlen=POLL_CADENCE_SAMPLES),
+            )
+        elif last_access > report[1]:
+            report[2].append((last_access - report[1]).total_seconds())
+            self._reports[vehicle.vin] = (state, last_access, report[2])
+
+    @staticmethod
+    def state(vehicle: Vehicle) -> str:
+        """Return polling state of vehicle (moving, active or idle)."""
+        charging = ExtendedDict(getattr(vehicle, "charging", None) or {})
+        climatisation = ExtendedDict(getattr(vehicle, "climatisation", None) or {})
+        if vehicle.is_moving:
+            return "moving"
+        if charging.getr("charging_status.charging_state") or climatisation.getr(
+            "climatisation_status.climatisation_state"
+        ) in ("heating", "cooling"):
+            return "active"
+        return "idle"
+
+    def interval(self, vehicle: Vehicle) -> float:
+        """Return interval between two polls of vehicle."""
+        state = self.state(vehicle)
+        interval = {"moving": self.moving, "active": self.active}.get(state, self.idle)
+        # Cadence observed in another state (e.g. parked) does not apply
+        report = self._reports.get(vehicle.vin)
+        if report is not None and report[0] == state and report[2]:
+            interval = max(interval, median(report[2]))
+        return min(max(interval, self.min_interval), self.max_interval)
+
+    def schedule(self, vehicle: Vehicle) -> float:
+        """Set and return next poll time of vehicle."""
+        interval = self.interval(vehicle) * uniform(1 - self.jitter, 1 + self.jitter)
+        self.next_poll[vehicle.vin] = time.monotonic() + interval
+        return self.next_poll[vehicle.vin]
+
+    async def async_refresh_account(self) -> None:
+        """Refresh account data when due."""
+        if self.next_account > time.monotonic():
+            return
+        # Vehicles list, location and vehicles information
+        if self.budget is not None and (wait := self.budget.acquire(3)):
+            _LOGGER.debug("Account refresh deferred by %.0fs", wait)
+            self.next_account = time.monotonic() + wait
+            self.deferred += 1
+            return
+        self.next_account = time.monotonic() + self.account
+        try:
+            await self.connect.async_update_account()
+        except AudiException as error:
+            _LOGGER.error("Error while updating account (%s)", error)
+
+    async def async_poll_due(self) -> float:
+        """Poll vehicles due and return seconds until the next poll."""
+        await self.async_refresh_account()
+        for vehicle in self.connect.vehicles:
+            if (due := self.next_poll.get(vehicle.vin)) is None:
+                self.observe(vehicle)
+                self.schedule(vehicle)
+                continue
+            if due > time.monotonic():
+                continue
+            plan = vehicle.update_plan()
+            if self.budget is not None and (wait := self.budget.acquire(plan.requests)):
+                _LOGGER.debug("Poll of %s deferred by %.0fs", vehicle.vin, wait)
+                self.next_poll[vehicle.vin] = time.monotonic() + wait
+                self.deferred += 1
+                continue
+            try:
+                await vehicle.async_update(sections=plan.sections)
+            except AudiException as error:
+                _LOGGER.error("Error while updating - %s - (%s)", vehicle.vin, error)
+            else:
+                self.observe(vehicle)
+            self.polls += 1
+            self.schedule(vehicle)
+
+        vins = {vehicle.vin for vehicle in self.connect.vehicles}
+        pending = [due for vin, due in self.next_poll.items() if vin in vins]
+        if not pending:
+            return min(self.min_interval, max(self.next_account - time.monotonic(), 0))
+        return max(min([*pending, self.next_account]) - time.monotonic(), 0)
+
+    async def async_run(self) -> None:
+        """Poll vehicles while connected."""
+        # Login does not fetch again when its first update failed
+        if self.connect.is_connected and not self.connect.vehicles:
+            try:
+                await self.connect.async_fetch_data()
+            except AudiException as error:
+                _LOGGER.error("Error while updating vehicles (%s)", error)
+        while self.connect.is_connected:
+            await asyncio.sleep(await self.async_poll_due())
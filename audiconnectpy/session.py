@@ -0,0 +1,38 @@
+"""Managed HTTP session."""
+
+from __future__ import annotations
+
+import ssl
+
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+
+from .const import (
+    SESSION_DNS_TTL,
+    SESSION_KEEPALIVE,
+    SESSION_LIMIT,
+    SESSION_LIMIT_PER_HOST,
+)
+
+
+def create_session(
+    limit: int = SESSION_LIMIT,
+    limit_per_host: int = SESSION_LIMIT_PER_HOST,
+    dns_ttl: int = SESSION_DNS_TTL,
+    keepalive: float = SESSION_KEEPALIVE,
+    ssl_context: ssl.SSLContext | None = None,
+) -> ClientSession:
+    """Return a session tuned for the few hosts of Audi Connect.
+
+    Connections are kept alive between poll cycles, resolved addresses are
+    cached and one TLS context is shared by every connection.
+    """
+    connector = TCPConnector(
+        limit=limit,
+        limit_per_host=limit_per_host,
+        ttl_dns_cache=dns_ttl,
+        use_dns_cache=True,
+        keepalive_timeout=keepalive,
+        enable_cleanup_closed=True,
+        ssl=ssl_context or ssl.create_default_context(),
+    )
+    return ClientSession(connector=connector, timeout=ClientTimeout(total=None))
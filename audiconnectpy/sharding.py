@@ -0,0 +1,173 @@
+"""Accounts sharded between worker processes."""
+
+from __future__ import annotations
+
+import asyncio
+from hashlib import blake2b
+import logging
+from multiprocessing import Process
+import os
+import time
+from typing import Any
+
+from .accounts import AudiFleet
+from .api import AudiConnect
+from .const import SHARD_COUNT, SHARD_HEARTBEAT, SHARD_TTL
+from .exceptions import AudiException
+from .scheduler import PollScheduler
+from .store import SharedStore
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _hash(*keys: str) -> int:
+    """Return stable hash of keys."""
+    digest = blake2b(":".join(keys).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+def shard_of(username: str, shards: int = SHARD_COUNT) -> int:
+    """Return shard of an account."""
+    return _hash(username) % shards
+
+
+class ShardCoordinator:
+    """Hand out shards to the workers alive in the shared store.
+
+    Shards go to workers by rendezvous hashing, so when a worker stops
+    sending heartbeats only its shards move to the others.
+    """
+
+    def __init__(
+        self, store: SharedStore, shards: int = SHARD_COUNT, ttl: float = SHARD_TTL
+    ) -> None:
+        """Initialize."""
+        self.store = store
+        self.shards = shards
+        self.ttl = ttl
+
+    async def async_assign(self, worker: str) -> set[int]:
+        """Send heartbeat of worker and return its shards."""
+        workers = await self.store.async_heartbeat(worker, self.ttl)
+        return {
+            shard
+            for shard in range(self.shards)
+            if max(workers, key=lambda owner: _hash(owner, str(shard))) == worker
+        }
+
+    async def async_leave(self, worker: str) -> None:
+        """Hand out shards of worker to the others."""
+        await self.store.async_leave(worker)
+
+
+class ShardWorker:
+    """Poll the accounts of the shards handed out to this worker.
+
+    Accounts are dicts of AudiFleet.add_account arguments. Tokens,
+    discovered urls and regions are read from the shared store, so an
+    account moving to another worker does not login again.
+    """
+
+    def __init__(
+        self,
+        store: SharedStore,
+        accounts: list[dict[str, Any]],
+        *,
+        worker_id: str | None = None,
+        shards: int = SHARD_COUNT,
+        ttl: float = SHARD_TTL,
+        heartbeat: float = SHARD_HEARTBEAT,
+        **kwargs: Any,
+    ) -> None:
+        """Initialize (kwargs are options of AudiFleet)."""
+        self.worker_id = worker_id or f"{os.uname().nodename}-{os.getpid()}"
+        self.coordinator = ShardCoordinator(store, shards, ttl)
+        self.accounts = {account["username"]: account for account in accounts}
+        self.heartbeat = heartbeat
+        self.fleet = AudiFleet(store=store, **kwargs)
+        self._tasks: dict[str, asyncio.Task[None]] = {}
+
+    @property
+    def owned(self) -> set[str]:
+        """Return usernames polled by this worker."""
+        return set(self._tasks)
+
+    async def async_rebalance(self, **kwargs: Any) -> None:
+        """Start polling accounts handed out, stop the others."""
+        shards = await self.coordinator.async_assign(self.worker_id)
+        wanted = {
+            username
+            for username in self.accounts
+            if shard_of(username, self.coordinator.shards) in shards
+        }
+        for username in self._tasks.keys() - wanted:
+            _LOGGER.debug("Release account %s", username)
+            self._tasks.pop(username).cancel()
+            self.fleet.remove_account(username)
+        for username in wanted - self._tasks.keys():
+            _LOGGER.debug("Take account %s", username)
+            api = self.fleet.add_account(**self.accounts[username])
+            self._tasks[username] = asyncio.create_task(self._async_poll(api, kwargs))
+
+    async def _async_poll(self, api: AudiConnect, options: dict[str, Any]) -> None:
+        """Login and poll an account until released."""
+        username = api.auth._username
+        while True:
+            try:
+                await api.async_login()
+                scheduler = PollScheduler(api, budget=self.fleet.budget, **options)
+                self.fleet.schedulers[username] = scheduler
+                await scheduler.async_run()
+            except AudiException as error:
+                _LOGGER.error("Polling failed - %s - (%s)", username, error)
+            await asyncio.sleep(self.heartbeat)
+
+    async def async_run(self, **kwargs: Any) -> None:
+        """Poll accounts of this worker (options of PollScheduler)."""
+        try:
+            while True:
+                await self.async_rebalance(**kwargs)
+                await asyncio.sleep(self.heartbeat)
+        finally:
+            for task in self._tasks.values():
+                task.cancel()
+            self._tasks.clear()
+            await self.coordinator.async_leave(self.worker_id)
+            await self.fleet.async_close()
+
+
+def _run_worker(
+    path: str, accounts: list[dict[str, Any]], worker_id: str, options: dict[str, Any]
+) -> None:
+    """Run a worker in its own process."""
+    worker = ShardWorker(SharedStore(path), accounts, worker_id=worker_id)
+    asyncio.run(worker.async_run(**options))
+
+
+def run_sharded(
+    path: str,
+    accounts: list[dict[str, Any]],
+    processes: int | None = None,
+    **kwargs: Any,
+) -> None:
+    """Poll accounts with worker processes sharing the store at path.
+
+    Workers which die are started again; until then their shards are
+    handed out to the others once their heartbeat is older than the ttl.
+    """
+    SharedStore(path).close()
+    workers: dict[int, Process] = {}
+    while True:
+        for index in range(processes or os.cpu_count() or 1):
+            process = workers.get(index)
+            if process is not None and process.is_alive():
+                continue
+            if process is not None:
+                _LOGGER.warning("Worker %s exited (%s)", index, process.exitcode)
+            workers[index] = process = Process(
+                target=_run_worker,
+                args=(path, accounts, f"worker-{index}", kwargs),
+                daemon=True,
+            )
+            process.start()
+        time.sleep(SHARD_HEARTBEAT)
@@ -0,0 +1,90 @@
+"""Versioned snapshots of vehicle state and JSON patches between them."""
+
+from __future__ import annotations
+
+from collections import deque
+from datetime import date
+import json
+from typing import Any
+
+from .const import SNAPSHOT_HISTORY
+
+
+def _default(obj: Any) -> Any:
+    """Serialize objects unknown to json."""
+    if isinstance(obj, date):
+        return obj.isoformat()
+    return str(obj)
+
+
+def dumps(obj: Any) -> bytes:
+    """Return compact JSON."""
+    return json.dumps(obj, separators=(",", ":"), default=_default).encode()
+
+
+def _pointer(path: str, key: str) -> str:
+    """Return JSON pointer of key."""
+    return f"{path}/{key.replace('~', '~0').replace('/', '~1')}"
+
+
+def json_patch(old: Any, new: Any, path: str = "") -> list[dict[str, Any]]:
+    """Return RFC 6902 operations turning old into new (lists are replaced)."""
+    if old == new:
+        return []
+    if not (isinstance(old, dict) and isinstance(new, dict)):
+        return [{"op": "replace", "path": path, "value": new}]
+    operations: list[dict[str, Any]] = []
+    for key in old.keys() - new.keys():
+        operations.append({"op": "remove", "path": _pointer(path, str(key))})
+    for key, value in new.items():
+        if key not in old:
+            operations.append(
+                {"op": "add", "path": _pointer(path, key), "value": value}
+            )
+        else:
+            operations.extend(json_patch(old[key], value, _pointer(path, key)))
+    return operations
+
+
+class StateHistory:
+    """Last versions of a state, with its serialized snapshot cached."""
+
+    def __init__(self, size: int = SNAPSHOT_HISTORY) -> None:
+        """Initialize."""
+        self.version = 0
+        self.state: dict[str, Any] = {}
+        self._history: deque[tuple[int, dict[str, Any]]] = deque(
+            [(0, self.state)], maxlen=size
+        )
+        self._json: bytes | None = None
+
+    def commit(self, state: dict[str, Any]) -> int:
+        """Store a new version of the state."""
+        self.version += 1
+        self.state = state
+        self._history.append((self.version, state))
+        self._json = None
+        return self.version
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return current version and state."""
+        return {"version": self.version, "state": self.state}
+
+    def snapshot_json(self) -> bytes:
+        """Return serialized snapshot (cached until the next version)."""
+        if self._json is None:
+            self._json = dumps(self.snapshot())
+        return self._json
+
+    def diff(self, version: int) -> dict[str, Any]:
+        """Return patch from version to the current one.
+
+        When version is no longer known, the patch replaces the whole state.
+        """
+        if version == self.version:
+            patch = []
+        elif (old := dict(self._history).get(version)) is not None:
+            patch = json_patch(old, self.state)
+        else:
+            patch = [{"op": "replace", "path": "", "value": self.state}]
+        return {"from": version, "version": self.version, "patch": patch}
@@ -0,0 +1,83 @@
+"""Profile of update cycles."""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+_STATS: ContextVar[UpdateStats | None] = ContextVar("stats", default=None)
+
+
+class UpdateStats:
+    """Requests, bytes and time spent by an update.
+
+    Times are seconds: `network` waiting for responses, `decode` decoding
+    JSON, `validate` loading the data model, `serialize` dumping the
+    model. `skipped` are endpoints not requested (not
+    subscribed, unsupported or static), `unchanged` sections not loaded
+    again.
+    """
+
+    def __init__(self, vin: str | None = None, model: str | None = None) -> None:
+        """Initialize."""
+        self.vin = vin
+        self.model = model
+        self.requests = 0
+        self.bytes = 0
+        self.cache_hits = 0
+        self.coalesced = 0
+        self.network = 0.0
+        self.decode = 0.0
+        self.validate = 0.0
+        self.serialize = 0.0
+        self.elapsed = 0.0
+        self.skipped: list[str] = []
+        self.unchanged: list[str] = []
+        self.vehicles: dict[str, UpdateStats] = {}
+
+    def __repr__(self) -> str:
+        """Return representation."""
+        return f"UpdateStats({self.as_dict()})"
+
+    def record_request(self, size: int, network: float) -> None:
+        """Record a response received."""
+        self.requests += 1
+        self.bytes += size
+        self.network += network
+
+    def add(self, stats: UpdateStats) -> None:
+        """Add stats of a vehicle to the cycle."""
+        if stats.vin is not None:
+            self.vehicles[stats.vin] = stats
+        self.requests += stats.requests
+        self.bytes += stats.bytes
+        self.cache_hits += stats.cache_hits
+        self.coalesced += stats.coalesced
+        self.network += stats.network
+        self.decode += stats.decode
+        self.validate += stats.validate
+        self.serialize += stats.serialize
+        prefix = f"{stats.vin}:" if stats.vin else ""
+        self.skipped.extend(prefix + endpoint for endpoint in stats.skipped)
+        self.unchanged.extend(prefix + section for section in stats.unchanged)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return stats as dict (vehicles excluded)."""
+        return {key: value for key, value in vars(self).items() if key != "vehicles"}
+
+
+@contextmanager
+def collect(stats: UpdateStats) -> Iterator[UpdateStats]:
+    """Collect stats of requests sent in this context."""
+    token = _STATS.set(stats)
+    try:
+        yield stats
+    finally:
+        _STATS.reset(token)
+
+
+def current_stats() -> UpdateStats | None:
+    """Return stats collected in this context."""
+    return _STATS.get()
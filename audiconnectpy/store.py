@@ -0,0 +1,115 @@
+"""State shared between processes."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+import json
+import sqlite3
+import time
+from typing import Any, TypeVar
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE TABLE IF NOT EXISTS workers (
+    worker TEXT PRIMARY KEY,
+    heartbeat REAL NOT NULL
+);
+"""
+
+_T = TypeVar("_T")
+
+
+class SharedStore:
+    """SQLite store of tokens, discovered urls and regions, shared by workers.
+
+    Values are JSON, each call is a short transaction so several processes
+    can use the same file. Calls run in a thread of the store, a locked
+    database (up to 30s) never blocks the event loop.
+    """
+
+    def __init__(self, path: str = ":memory:") -> None:
+        """Initialize."""
+        self.path = path
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix="audi-store")
+        self._db = sqlite3.connect(
+            path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        if path != ":memory:":
+            self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+
+    async def _async_run(self, func: Callable[..., _T], *args: Any) -> _T:
+        """Return func(*args), run in the thread of the store."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    async def async_get(self, namespace: str, key: str) -> Any:
+        """Return value of key or None."""
+        return await self._async_run(self._get, namespace, key)
+
+    async def async_set(self, namespace: str, key: str, value: Any) -> None:
+        """Store value of key."""
+        await self._async_run(self._set, namespace, key, value)
+
+    async def async_delete(self, namespace: str, key: str, value: Any = None) -> None:
+        """Remove key (only if it still holds value, when given)."""
+        await self._async_run(self._delete, namespace, key, value)
+
+    async def async_heartbeat(self, worker: str, ttl: float) -> list[str]:
+        """Mark worker alive and return workers alive within ttl (sorted)."""
+        return await self._async_run(self._heartbeat, worker, ttl)
+
+    async def async_leave(self, worker: str) -> None:
+        """Remove worker so its shards are handed out at once."""
+        await self._async_run(self._leave, worker)
+
+    def close(self) -> None:
+        """Close database."""
+        self._executor.submit(self._db.close).result()
+        self._executor.shutdown()
+
+    def _get(self, namespace: str, key: str) -> Any:
+        row = self._db.execute(
+            "SELECT value FROM entries WHERE namespace = ? AND key = ?",
+            (namespace, key),
+        ).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def _set(self, namespace: str, key: str, value: Any) -> None:
+        self._db.execute(
+            "INSERT OR REPLACE INTO entries (namespace, key, value) VALUES (?, ?, ?)",
+            (namespace, key, json.dumps(value)),
+        )
+
+    def _delete(self, namespace: str, key: str, value: Any) -> None:
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            if value is None or self._get(namespace, key) == value:
+                self._db.execute(
+                    "DELETE FROM entries WHERE namespace = ? AND key = ?",
+                    (namespace, key),
+                )
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+
+    def _heartbeat(self, worker: str, ttl: float) -> list[str]:
+        now = time.time()
+        self._db.execute(
+            "INSERT OR REPLACE INTO workers (worker, heartbeat) VALUES (?, ?)",
+            (worker, now),
+        )
+        self._db.execute("DELETE FROM workers WHERE heartbeat < ?", (now - ttl,))
+        rows = self._db.execute("SELECT worker FROM workers ORDER BY worker")
+        return [row[0] for row in rows]
+
+    def _leave(self, worker: str) -> None:
+        self._db.execute("DELETE FROM workers WHERE worker = ?", (worker,))
@@ -0,0 +1,110 @@
+"""Tracing spans, compatible with OpenTelemetry tracers."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import Iterator
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from contextvars import ContextVar
+import time
+from typing import Any
+from urllib.parse import urlparse
+
+from .const import TRACE_SPANS
+from .helpers import endpoint_template
+
+_SPAN: ContextVar[Span | None] = ContextVar("span", default=None)
+
+
+def start_span(
+    tracer: Any, name: str, attributes: dict[str, Any] | None = None
+) -> AbstractContextManager[Any]:
+    """Return span context of tracer (an OpenTelemetry tracer or SpanRecorder).
+
+    Without tracer, nothing is recorded.
+    """
+    if tracer is None:
+        return nullcontext()
+    return tracer.start_as_current_span(name, attributes=attributes)  # type: ignore[no-any-return]
+
+
+def http_attributes(method: str, url: str) -> dict[str, Any]:
+    """Return attributes of a request span (url without identifiers nor query)."""
+    return {
+        "http.request.method": method,
+        "server.address": urlparse(str(url)).hostname or "",
+        "url.template": endpoint_template(url),
+    }
+
+
+class Span:
+    """Span recorded in memory."""
+
+    def __init__(
+        self, name: str, attributes: dict[str, Any] | None, parent: Span | None
+    ) -> None:
+        """Initialize."""
+        self.name = name
+        self.attributes = dict(attributes or {})
+        self.parent = parent
+        self.status = "ok"
+        self.exception: BaseException | None = None
+        self.start = time.perf_counter()
+        self.end: float | None = None
+
+    def __repr__(self) -> str:
+        """Return representation."""
+        return f"Span({self.name!r}, {self.status}, {self.duration:.3f}s)"
+
+    @property
+    def duration(self) -> float:
+        """Return duration in seconds."""
+        return (self.end or time.perf_counter()) - self.start
+
+    def is_recording(self) -> bool:
+        """Return True while the span is open."""
+        return self.end is None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Set attribute."""
+        self.attributes[key] = value
+
+    def record_exception(self, exception: BaseException) -> None:
+        """Record exception ending the span."""
+        self.exception = exception
+        self.status = (
+            "cancelled" if isinstance(exception, asyncio.CancelledError) else "error"
+        )
+
+
+class SpanRecorder:
+    """Tracer keeping the last finished spans in memory.
+
+    Use an OpenTelemetry tracer instead to export spans.
+    """
+
+    def __init__(self, maxlen: int = TRACE_SPANS) -> None:
+        """Initialize."""
+        self.spans: deque[Span] = deque(maxlen=maxlen)
+
+    @contextmanager
+    def start_as_current_span(
+        self, name: str, attributes: dict[str, Any] | None = None, **_kwargs: Any
+    ) -> Iterator[Span]:
+        """Open a span, child of the current one."""
+        span = Span(name, attributes, _SPAN.get())
+        token = _SPAN.set(span)
+        try:
+            yield span
+        except BaseException as exception:
+            span.record_exception(exception)
+            raise
+        finally:
+            span.end = time.perf_counter()
+            _SPAN.reset(token)
+            self.spans.append(span)
+
+    def children(self, span: Span) -> list[Span]:
+        """Return finished children of a span."""
+        return [child for child in self.spans if child.parent is span]
@@ -0,0 +1,82 @@
+"""Unit conversion of vehicle state."""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+from typing import Any, Literal, NamedTuple
+
+from pydantic import BaseModel
+
+UnitSystem = Literal["metric", "imperial"]
+
+KM_TO_MI = 0.621371
+
+
+class Measurement(NamedTuple):
+    """Value converted to the unit system."""
+
+    value: float
+    unit: str
+
+
+def _celsius(value: float) -> float:
+    return round(value, 1)
+
+
+def _fahrenheit(value: float) -> float:
+    return round(value * 9 / 5 + 32, 1)
+
+
+# Field suffix: unit system -> (unit, conversion)
+CONVERSIONS: dict[str, dict[str, tuple[str, Callable[[float], float]]]] = {
+    "_km": {
+        "metric": ("km", lambda value: value),
+        "imperial": ("mi", lambda value: round(value * KM_TO_MI, 1)),
+    },
+    "_kmph": {
+        "metric": ("km/h", lambda value: value),
+        "imperial": ("mph", lambda value: round(value * KM_TO_MI, 1)),
+    },
+    "_c": {"metric": ("°C", _celsius), "imperial": ("°F", _fahrenheit)},
+    "_k": {
+        "metric": ("°C", lambda value: _celsius(value - 273.15)),
+        "imperial": ("°F", lambda value: _fahrenheit(value - 273.15)),
+    },
+}
+
+# Fields in km without suffix
+KM_FIELDS = ("ad_blue_range", "electric_range", "gasoline_range", "odometer")
+
+
+def convert_units(
+    state: Any, unit_system: UnitSystem = "metric", path: str = ""
+) -> dict[str, Measurement]:
+    """Return measurements of state by path, without unit suffix.
+
+    e.g. measurements.odometer_status.mileage_km gives the measurement of
+    measurements.odometer_status.mileage.
+    """
+    items: Iterable[tuple[Any, Any]]
+    if isinstance(state, BaseModel):
+        items = ((name, getattr(state, name)) for name in type(state).model_fields)
+    elif isinstance(state, dict):
+        items = state.items()
+    else:
+        return {}
+    measurements: dict[str, Measurement] = {}
+    for name, value in items:
+        if value is None:
+            continue
+        key = f"{path}.{name}" if path else str(name)
+        if isinstance(value, (BaseModel, dict)):
+            measurements.update(convert_units(value, unit_system, key))
+            continue
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            continue
+        stem, _, suffix = key.rpartition("_")
+        if name in KM_FIELDS:
+            stem, suffix = key, "km"
+        if (conversion := CONVERSIONS.get(f"_{suffix}")) is not None:
+            unit, convert = conversion[unit_system]
+            measurements[stem] = Measurement(convert(value), unit)
+    return measurements
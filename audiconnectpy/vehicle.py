@@ -3,42 +3,51 @@
 from __future__ import annotations
 
 import asyncio
+from collections.abc import Callable
 from datetime import datetime
 import json
 import logging
+import time
 from typing import Any, Iterable, Literal, cast
 
 from pydantic import ConfigDict, Field, ValidationError
 from pydantic.alias_generators import to_camel
 from pydantic.dataclasses import dataclass
 
+from .changes import ChangeEvent, ChangeHub, ChangeSubscription, Overflow, field_changes
+from .commands import CommandQueue, command
 from .const import (
     BRAND,
+    CHANGES_MAXSIZE,
     FAILED,
+    GRAPHQL_VEHICLE_FIELDS,
     MAX_RESPONSE_ATTEMPTS,
     REQUEST_FAILED,
     REQUEST_STATUS_SLEEP,
     REQUEST_SUCCESSFUL,
     SUCCEEDED,
     SUCCESSFUL,
+    UPDATE_ENDPOINTS,
+    UPDATE_SECTIONS,
 )
-from .exceptions import AudiException, HttpRequestError, TimeoutExceededError
-from .helpers import ExtendedDict, spin_hash
-from .model import ClimatisationTimers, Model, Position
+from .exceptions import (
+    AudiException,
+    DeadlineExceededError,
+    HttpRequestError,
+    TimeoutExceededError,
+)
+from .helpers import ExtendedDict, camel2snake, deadline, lane, spin_hash
+from .model import ClimatisationTimers, Location, Model, Position
+from .planner import JOB_SECTIONS, UpdatePlan, field_section, plan_update
+from .snapshot import StateHistory
+from .stats import UpdateStats, collect
+from .tracing import start_span
+from .units import Measurement, UnitSystem, convert_units
 
 logger = logging.getLogger(__name__)
 
 
-class Globals:
-    """Global variables."""
-
-    def __init__(self, unit: str) -> None:
-        """Initilaze."""
-        global UNIT_SYSTEM
-        UNIT_SYSTEM = f"{unit}"  # type: ignore
-
-
-@dataclass(config=ConfigDict(alias_generator=to_camel))
+@dataclass(config=ConfigDict(alias_generator=to_camel, arbitrary_types_allowed=True))
 class Vehicle:
     """Vehicle class."""
 
@@ -47,6 +56,7 @@ class Vehicle:
     auth: Any
     fill_region: Any = Field(alias="fill_region")
     spin: str | None = None
+    unit_system: UnitSystem = Field(default="metric", alias="unit_system")
     last_access: datetime | None = None
     last_update: datetime | None = None
     is_moving: bool | None = None
@@ -55,7 +65,17 @@ class Vehicle:
     position_supported: bool | None = None
     locations_supported: bool | None = None
     trips_supported: bool | None = None
+    information_supported: bool | None = None
     position: Position | None = None
+    location: Location | None = None
+    information: dict[str, Any] | None = None
+    subscriptions: dict[str, int] = Field(default_factory=dict)
+    payloads: dict[str, Any] = Field(default_factory=dict, repr=False)
+    sections_skipped: int = 0
+    hub: ChangeHub = Field(default_factory=ChangeHub, repr=False)
+    history: StateHistory = Field(default_factory=StateHistory, repr=False)
+    commands: CommandQueue = Field(default_factory=CommandQueue, repr=False)
+    units: dict[str, Measurement] = Field(default_factory=dict, repr=False)
     climatisation_timers: ClimatisationTimers = Field(default_factory=list)
     _api_level = {
         "climatisation": 2,  # 2 or 3
@@ -65,6 +85,11 @@ class Vehicle:
         "lock": 2,  # 1 or 2 (json)
     }
 
+    @property
+    def tracer(self) -> Any:
+        """Return tracer of spans."""
+        return self.auth.tracer
+
     @property
     def api_level(self) -> dict[str, int]:
         """Return API Level."""
@@ -81,85 +106,260 @@ class Vehicle:
         if mode in self._api_level.keys():
             self._api_level[mode] = int(value)
 
-    async def async_update(self) -> None:
-        """Update data vehicle."""
+    def subscribe(self, *fields: str) -> Callable[[], None]:
+        """Subscribe to fields (e.g. charging.battery_status.current_soc_pct).
 
-        data = {}
+        Return a callback to unsubscribe.
+        """
+        for field in fields:
+            field_section(field)
+        for field in fields:
+            self.subscriptions[field] = self.subscriptions.get(field, 0) + 1
 
-        # Capabilities
-        try:
-            if self.capabilities_supported is not False:
-                capabilities = await self.async_get_capabilities()
-                self.capabilities = capabilities.get("capabilities")
-                self.capabilities_supported = self.capabilities is not None
-        except AttributeError:
-            logger.warning("Capabilities failed: format is incorrect")
-            self.capabilities_supported = None
-        except AudiException:
-            self.capabilities_supported = False
-
-        # Get information
-        try:
-            infos = await self.async_get_information()
-            data.update({"infos": infos})
-        except (AttributeError, AudiException) as error:
-            raise AudiException(error) from error
+        def unsubscribe() -> None:
+            for field in fields:
+                if self.subscriptions.get(field, 0) > 1:
+                    self.subscriptions[field] -= 1
+                else:
+                    self.subscriptions.pop(field, None)
 
-        # Selective status
-        try:
-            selectivestatus = await self.async_get_selectivestatus()
-            data.update(selectivestatus)
-        except (AttributeError, AudiException) as error:
-            raise AudiException(error) from error
+        return unsubscribe
 
-        # Position
-        try:
-            if self.position_supported is not False:
-                position = await self.async_get_position()
-                if "data" in position:
-                    data.update({"position": position})
-                    self.is_moving = False
-                else:
-                    self.is_moving = True
-                self.position_supported = position is not None
-        except AttributeError:
-            logger.warning("Position failed: format is incorrect")
-            self.position_supported = None
-        except AudiException as error:
-            logger.debug(error)
-            self.position_supported = False
+    def changes(
+        self, maxsize: int = CHANGES_MAXSIZE, overflow: Overflow = "drop_oldest"
+    ) -> ChangeSubscription:
+        """Return a stream of field changes published by updates."""
+        return self.hub.subscribe(maxsize, overflow)
 
-        # Locations (here.com)
-        try:
-            if self.locations_supported is not False:
-                if location := await self.async_get_location():
-                    data.update({"location": location})
-                    self.locations_supported = location is not None
-        except AttributeError:
-            logger.warning("Locations failed: format is incorrect")
-            self.locations_supported = None
-        except AudiException as error:
-            logger.debug(error)
-            self.locations_supported = False
+    @property
+    def version(self) -> int:
+        """Return version of the state, increased when it changes."""
+        return self.history.version
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return versioned state."""
+        return self.history.snapshot()
+
+    def snapshot_json(self) -> bytes:
+        """Return versioned state serialized (cached until it changes)."""
+        return self.history.snapshot_json()
+
+    def diff(self, version: int) -> dict[str, Any]:
+        """Return JSON patch from a version of the state to the current one."""
+        return self.history.diff(version)
+
+    def measurement(self, path: str) -> Measurement | None:
+        """Return value in the unit system (e.g. measurements.odometer_status.mileage)."""
+        return self.units.get(path)
+
+    def update_plan(self) -> UpdatePlan:
+        """Return the smallest update covering the subscribed fields."""
+        return plan_update(
+            self.subscriptions or None,
+            capabilities_supported=self.capabilities_supported,
+            position_supported=self.position_supported,
+            information_known=self.information is not None
+            or self.information_supported is False,
+        )
 
-        # Trips
-        try:
-            await self.async_get_trip_last()
-            self.trips_supported = True
-        except AudiException as error:
-            logger.debug(error)
-            self.trips_supported = False
+    async def async_update(
+        self, timeout: float | None = None, sections: Iterable[str] | None = None
+    ) -> UpdateStats:
+        """Update data vehicle and return its profile.
+
+        The timeout bounds the whole update, each request gets the remaining time.
+        With sections (attribute names, e.g. ["charging", "position"]), only
+        these are requested and merged into the current state.
+        """
+        wanted = None if sections is None else set(sections)
+        jobs = None
+        if wanted is not None:
+            if unknown := wanted - set(Model.model_fields) - set(UPDATE_SECTIONS):
+                raise ValueError(f"Unknown sections: {', '.join(sorted(unknown))}")
+            jobs = [to_camel(name) for name in wanted if name in JOB_SECTIONS]
+
+        def requested(section: str) -> bool:
+            return wanted is None or section in wanted
+
+        metrics = self.auth.metrics
+        stats = UpdateStats(self.vin)
+        fetched: set[str] = set()
+        start = mark = time.perf_counter()
+
+        def phase(name: str) -> float:
+            """Return duration of a phase (recorded in metrics)."""
+            nonlocal mark
+            now = time.perf_counter()
+            if metrics is not None:
+                metrics.observe("update_phase_seconds", now - mark, phase=name)
+            elapsed, mark = now - mark, now
+            return elapsed
+
+        with (
+            deadline(timeout),
+            lane("background"),
+            collect(stats),
+            start_span(self.tracer, "audi.update", {"audi.vin": self.vin}),
+        ):
+            data: dict[str, Any] = {}
+
+            # Capabilities
+            try:
+                if (
+                    requested("capabilities")
+                    and self.capabilities_supported is not False
+                ):
+                    capabilities = await self.async_get_capabilities()
+                    fetched.add("capabilities")
+                    self.capabilities = capabilities.get("capabilities")
+                    self.capabilities_supported = self.capabilities is not None
+            except AttributeError:
+                logger.warning("Capabilities failed: format is incorrect")
+                self.capabilities_supported = None
+            except DeadlineExceededError:
+                raise
+            except TimeoutExceededError as error:
+                logger.debug(error)
+            except AudiException:
+                self.capabilities_supported = False
+
+            # Get information (static, fetched once)
+            try:
+                if requested("infos") and self.information_supported is not False:
+                    if (infos := self.information) is None:
+                        infos = await self.async_get_information()
+                        fetched.add("infos")
+                        if ExtendedDict(infos).getr("data.userVehicle"):
+                            self.information = infos
+                        self.information_supported = self.information is not None
+                    data.update({"infos": infos})
+            except (AttributeError, AudiException) as error:
+                raise AudiException(error) from error
+
+            # Selective status
+            try:
+                if jobs is None or jobs:
+                    selectivestatus = await self.async_get_selectivestatus(jobs)
+                    fetched.add("selectivestatus")
+                    data.update(selectivestatus)
+            except (AttributeError, AudiException) as error:
+                raise AudiException(error) from error
+
+            # Position
+            try:
+                if requested("position") and self.position_supported is not False:
+                    position = await self.async_get_position()
+                    fetched.add("position")
+                    if "data" in position:
+                        data.update({"position": position})
+                        self.is_moving = False
+                    else:
+                        self.is_moving = True
+                    self.position_supported = position is not None
+            except AttributeError:
+                logger.warning("Position failed: format is incorrect")
+                self.position_supported = None
+            except DeadlineExceededError:
+                raise
+            except TimeoutExceededError as error:
+                logger.debug(error)
+            except AudiException as error:
+                logger.debug(error)
+                self.position_supported = False
+
+            # Trips
+            try:
+                if requested("trips"):
+                    await self.async_get_trip_last()
+                    fetched.add("trips")
+                    self.trips_supported = True
+            except DeadlineExceededError:
+                raise
+            except TimeoutExceededError as error:
+                logger.debug(error)
+            except AudiException as error:
+                logger.debug(error)
+                self.trips_supported = False
+
+            phase("fetch")
+            stats.skipped = [
+                endpoint for endpoint in UPDATE_ENDPOINTS if endpoint not in fetched
+            ]
+
+            # Skip sections unchanged since the last update (raw payloads)
+            unchanged = {
+                key
+                for key, value in data.items()
+                if key in self.payloads and self.payloads[key] == value
+            }
+            changed = {
+                key: value for key, value in data.items() if key not in unchanged
+            }
+            phase("compare")
 
-        # Load data model
-        try:
-            vehicle_model = Model(**data)
-        except ValidationError as error:
-            raise AudiException(error) from error
-        else:
-            model = dict(vehicle_model.model_dump())
-            for attr in model:
-                obj = model.get(attr)
-                setattr(self, attr, obj)
+            # Load data model (in an executor for large payloads)
+            try:
+                if (offload := self.auth.offload) is None:
+                    vehicle_model = Model(**changed)
+                else:
+                    # Bytes received by this update stand for the payload size
+                    vehicle_model = await offload.async_run(
+                        stats.bytes,
+                        Model.model_validate,
+                        changed,
+                    )
+            except ValidationError as error:
+                raise AudiException(error) from error
+            else:
+                stats.validate += phase("validate")
+                fields = set(Model.model_fields)
+                if wanted is not None:
+                    fields &= wanted
+                skipped = {camel2snake(key) for key in unchanged} & fields
+                include = (fields - skipped - {"last_access"}) | {"last_update"}
+                if "access" in include:
+                    include.add("last_access")
+                self.payloads = {
+                    key: value
+                    for key, value in self.payloads.items()
+                    if camel2snake(key) not in fields
+                } | data
+                self.sections_skipped = len(skipped)
+                stats.unchanged = sorted(skipped)
+                model = dict(vehicle_model.model_dump(include=include))
+                stats.serialize += phase("dump")
+                changes: list[ChangeEvent] = []
+                modified = False
+                for attr in model:
+                    obj = model.get(attr)
+                    old = getattr(self, attr, None)
+                    if attr != "last_update" and old != obj:
+                        modified = True
+                        if self.hub.active:
+                            changes.extend(
+                                ChangeEvent(self.vin, *change)
+                                for change in field_changes(attr, old, obj)
+                            )
+                    setattr(self, attr, obj)
+                if modified:
+                    self.history.commit(
+                        {
+                            name: getattr(self, name, None)
+                            for name in Model.model_fields
+                            if name != "last_update"
+                        }
+                    )
+                    self.units = convert_units(self.history.state, self.unit_system)
+                phase("apply")
+                if changes:
+                    await self.hub.publish(changes)
+                    phase("publish")
+
+        stats.model = ExtendedDict(self.information or {}).getr(
+            "data.userVehicle.vehicle.media.shortName"
+        )
+        stats.elapsed = time.perf_counter() - start
+        return stats
 
     async def async_get_information(self) -> Any:
         """Get information vehicles."""
@@ -177,7 +377,7 @@ class Vehicle:
         #     "query": "query vehicleList {userVehicles {vin mappingVin vehicle { core {modelYear} media { shortName longName }} csid commissionNumber type devicePlatform mbbConnect userRole {role} vehicle {classification {driveTrain}} nickname}}"
         # }
         data = {
-            "query": 'query ($vin: String!) {userVehicle(vehicleCoreId: $vin) {vehicle {core {modelYear} classification {modelRange} media {shortName longName} renderPictures(mediaTypes: "MYAPN1NB") { mediaType url}}}}',
+            "query": f"query ($vin: String!) {{userVehicle(vehicleCoreId: $vin) {{{GRAPHQL_VEHICLE_FIELDS}}}}}",
             "variables": {"vin": f"{self.vin}"},
         }
 
@@ -191,14 +391,6 @@ class Vehicle:
 
         return data
 
-    async def async_get_location(self) -> Any:
-        """Get destination data."""
-        headers = await self.auth.async_get_headers(token_type="here")
-        data = await self.auth.request(
-            "GET", f"{self.uris['here_url']}/location", headers=headers
-        )
-        return data
-
     async def async_get_position(self) -> Any:
         """Get position data."""
         headers = await self.auth.async_get_headers(token_type="idk")
@@ -235,7 +427,15 @@ class Vehicle:
     async def async_get_selectivestatus(
         self, capabilities: Iterable[str] | None = None
     ) -> Any:
-        """Get capabilities."""
+        """Get capabilities (every user capability if not specified)."""
+        if capabilities is not None:
+            headers = await self.auth.async_get_headers(token_type="idk")
+            return await self.auth.request(
+                "GET",
+                f"{self.uris['mdk_url']}vehicle/v1/vehicles/{self.vin}/selectivestatus?jobs={','.join(capabilities)}",
+                headers=headers,
+            )
+
         headers = await self.auth.async_get_headers(token_type="idk")
         response = await self.auth.request(
             "GET",
@@ -273,6 +473,7 @@ class Vehicle:
         )
         return data
 
+    @command("wakeup")
     async def async_wakeup(self) -> Any:
         """Waek up vehicle."""
         headers = await self.auth.async_get_headers(token_type="idk")
@@ -283,6 +484,7 @@ class Vehicle:
         )
         return data
 
+    @command("lock")
     async def async_set_lock(self, lock: bool) -> None:
         """Set lock."""
         if self.api_level["lock"] == 1:
@@ -331,6 +533,7 @@ class Vehicle:
                     request_id,
                 )
 
+    @command("climatisation")
     async def async_set_climatisation(
         self,
         action: bool,
@@ -432,6 +635,7 @@ class Vehicle:
             data = json.dumps(data)
             await post_req(headers, data)
 
+    @command("climatisation_settings")
     async def async_set_climatisation_settings(
         self,
         temperature: float = 19.5,
@@ -531,6 +735,7 @@ class Vehicle:
             data = json.dumps(data)
             await post_req(headers, data)
 
+    @command("auxiliary_climatisation")
     async def async_set_auxiliary_climatisation(
         self, action: bool, duration: int = 60
     ) -> None:
@@ -597,6 +802,7 @@ class Vehicle:
             data = json.dumps(data)
             await post_req(headers, data)
 
+    @command("ventilation")
     async def async_set_ventilation(self, action: bool, duration: int = 60) -> None:
         """Set ventilation."""
 
@@ -650,6 +856,7 @@ class Vehicle:
             data = json.dumps(data)
             await post_req(headers, data)
 
+    @command("charger")
     async def async_set_charger(self, action: bool, timer: bool = False) -> None:
         """Set battery charger."""
 
@@ -721,6 +928,7 @@ class Vehicle:
             data = f'<?xml version="1.0" encoding="UTF-8" ?><action><type>{"start" if action else "stop"}</type></action>'
             await post_req(headers, data)
 
+    @command("charging_settings")
     async def async_set_charging_settings(self, current: float = 32) -> None:
         """Set max current."""
 
@@ -784,6 +992,7 @@ class Vehicle:
             )
             await post_req(headers, data)
 
+    @command("window_heating")
     async def async_set_window_heating(self, action: bool) -> None:
         """Set window heating."""
 
@@ -838,6 +1047,7 @@ class Vehicle:
             )
             await post_req(headers, data)
 
+    @command("honkflash")
     async def async_set_honkflash(
         self, mode: Literal["honk", "flash"], duration: int = 15
     ) -> None:
@@ -863,6 +1073,7 @@ class Vehicle:
                 json=data,
             )
 
+    @command("care_mode")
     async def async_set_care_mode_setttings(
         self, data: Literal["activated", "deactivated"]
     ) -> None:
@@ -883,6 +1094,7 @@ class Vehicle:
             request_id,
         )
 
+    @command("readiness_battery_support")
     async def async_set_readiness_battery_support(self, action: bool) -> None:
         """Execute readiness battery support actions."""
         headers = await self.auth.async_get_headers(token_type="idk")
@@ -901,6 +1113,7 @@ class Vehicle:
             request_id,
         )
 
+    @command("climatisation_timer_{timer_id}")
     async def async_set_climatisation_timers(self, timer_id: int, enable: bool) -> None:
         """Execute climatisation timers actions."""
 
@@ -926,6 +1139,7 @@ class Vehicle:
             request_id,
         )
 
+    @command("auxiliary_heating_timers")
     async def async_set_auxiliary_heating_timers(self, data: Any) -> None:
         """ "Execute auxiliary heating timers actions."""
         headers = await self.auth.async_get_headers(token_type="idk")
@@ -944,6 +1158,7 @@ class Vehicle:
             request_id,
         )
 
+    @command("departure_profiles")
     async def async_set_departure_profiles(self, data: Any) -> None:
         """Execute departure timers actions."""
         headers = await self.auth.async_get_headers(token_type="idk")
@@ -962,6 +1177,7 @@ class Vehicle:
             request_id,
         )
 
+    @command("departure_timer_{timer_id}")
     async def async_set_departure_timer(self, timer_id: int, enable: bool) -> None:
         """Execute departure timers actions."""
 
@@ -986,6 +1202,7 @@ class Vehicle:
             request_id,
         )
 
+    @command("refresh")
     async def async_refresh_vehicle_data(self) -> None:
         """Refresh vehicle data."""
         headers = await self.auth.async_get_headers(token_type="idk")
@@ -1011,8 +1228,12 @@ class Vehicle:
         for _ in range(MAX_RESPONSE_ATTEMPTS):
             await asyncio.sleep(REQUEST_STATUS_SLEEP)
 
-            headers = await self.auth.async_get_headers(token_type="idk")
-            rsp = await self.auth.request("GET", url, headers=headers)
+            start = time.perf_counter()
+            with lane("confirmation"):
+                headers = await self.auth.async_get_headers(token_type="idk")
+                rsp = await self.auth.request("GET", url, headers=headers)
+            if (metrics := self.auth.metrics) is not None:
+                metrics.lap("confirmation_poll_seconds", start, action=action)
 
             status = None
             if rsp and (data := rsp.get("data")):
@@ -1060,8 +1281,12 @@ class Vehicle:
         for _ in range(MAX_RESPONSE_ATTEMPTS):
             await asyncio.sleep(REQUEST_STATUS_SLEEP)
 
-            headers = await self.auth.async_get_headers(token_type="mbb")
-            rsp = await self.auth.request("GET", url, headers=headers)
+            start = time.perf_counter()
+            with lane("confirmation"):
+                headers = await self.auth.async_get_headers(token_type="mbb")
+                rsp = await self.auth.request("GET", url, headers=headers)
+            if (metrics := self.auth.metrics) is not None:
+                metrics.lap("confirmation_poll_seconds", start, action=action)
 
             status = ExtendedDict(rsp).getr(path)
 
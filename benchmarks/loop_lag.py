@@ -0,0 +1,73 @@
+"""Event loop lag while decoding and validating large payloads.
+
+Run from the repository root: python -m benchmarks.loop_lag
+"""
+
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+import json
+from pathlib import Path
+import time
+
+from audiconnectpy.helpers import json_loads
+from audiconnectpy.model import Model
+from audiconnectpy.offload import Offloader
+
+FIXTURES = Path(__file__).parent.parent / "tests" / "fixtures"
+ROUNDS = 20
+
+
+async def probe(lags: list[float], stop: asyncio.Event) -> None:
+    """Measure how late the loop wakes up a 1 ms sleep."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.001)
+        lags.append(time.perf_counter() - start - 0.001)
+
+
+async def workload(offload: Offloader, location: bytes, status: bytes) -> None:
+    """Decode the location list and validate a full status, several times."""
+    data = json.loads(status)
+    for _ in range(ROUNDS):
+        await offload.async_run(len(location), json_loads, location)
+        await offload.async_run(len(status), Model.model_validate, data)
+        await asyncio.sleep(0)
+
+
+async def measure(name: str, offload: Offloader, *payloads: bytes) -> None:
+    """Print loop lag during the workload."""
+    lags: list[float] = []
+    stop = asyncio.Event()
+    task = asyncio.create_task(probe(lags, stop))
+    start = time.perf_counter()
+    await workload(offload, *payloads)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await task
+    lags.sort()
+    print(
+        f"{name:8} total {elapsed * 1000:7.1f} ms"
+        f"  lag p50 {lags[len(lags) // 2] * 1000:6.2f} ms"
+        f"  p99 {lags[int(len(lags) * 0.99)] * 1000:6.2f} ms"
+        f"  max {lags[-1] * 1000:6.2f} ms"
+    )
+
+
+async def main() -> None:
+    """Compare inline, thread and process offload."""
+    location = json.loads((FIXTURES / "location.json").read_text())
+    location["data"] = location["data"] * 20
+    raw = json.dumps(location).encode()
+    status = (FIXTURES / "audi1.json").read_bytes()
+    print(f"location list {len(raw)} bytes, status {len(status)} bytes")
+
+    await measure("inline", Offloader(threshold=len(raw) + 1), raw, status)
+    await measure("thread", Offloader(threshold=0), raw, status)
+    with ProcessPoolExecutor(2) as executor:
+        await measure("process", Offloader(threshold=0, executor=executor), raw, status)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,37 @@
+"""Tests fleet of accounts."""
+
+from __future__ import annotations
+
+from unittest.mock import patch
+
+from audiconnectpy import AudiFleet
+from audiconnectpy.exceptions import AuthorizationError
+
+PWD = "password"
+
+
+@patch("audiconnectpy.api.AudiConnect.async_fetch_data")
+@patch("audiconnectpy.auth.Auth._async_login_flow")
+async def test_fleet_login(login, fetch_data, uris) -> None:
+    """Test accounts share resources and discover services once."""
+    async with AudiFleet(stagger=0.01, refresh_spread=300) as fleet:
+        accounts = [
+            fleet.add_account(f"user{index}@z.zz", PWD, "FR") for index in range(3)
+        ]
+        assert {api.auth.session for api in accounts} == {fleet.session}
+        assert {api.auth.lanes for api in accounts} == {fleet.lanes}
+        assert [api.auth.refresh_skew for api in accounts] == [0, 100, 200]
+
+        login.side_effect = [None, AuthorizationError("Locked"), None]
+        with patch(
+            "audiconnectpy.auth.Auth._async_discover_urls", return_value=uris
+        ) as discover:
+            errors = await fleet.async_login()
+
+    discover.assert_called_once()
+    assert fleet.discovery.hits == 2
+    assert accounts[2].auth.uris == uris
+    assert errors["user0@z.zz"] is None
+    assert isinstance(errors["user1@z.zz"], AuthorizationError)
+    assert [api.is_connected for api in accounts] == [True, False, True]
+    assert fleet.session.closed
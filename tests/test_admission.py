@@ -0,0 +1,87 @@
+"""Tests login admission."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from audiconnectpy import LoginAdmission
+from audiconnectpy.exceptions import (
+    HttpRequestError,
+    ServiceNotFoundError,
+    TimeoutExceededError,
+)
+
+
+async def test_concurrency_cap() -> None:
+    """Test logins beyond the cap wait in queue."""
+    admission = LoginAdmission(concurrency=2)
+    running = 0
+    peak = 0
+
+    async def login() -> None:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    tasks = [asyncio.create_task(admission.async_login(login)) for _ in range(5)]
+    await asyncio.sleep(0)
+    assert admission.depth == 3
+    await asyncio.gather(*tasks)
+    assert peak == 2
+    assert admission.max_depth == 3
+    assert admission.logins == 5
+    assert admission.wait_max > 0
+    assert admission.duration_avg > 0
+
+
+async def test_shared_backoff() -> None:
+    """Test a failed login closes admission for the others."""
+    admission = LoginAdmission(backoff=0.02, tries=2)
+    calls = []
+
+    async def failing() -> None:
+        calls.append(asyncio.get_running_loop().time())
+        raise HttpRequestError("Throttled")
+
+    async def login() -> None:
+        calls.append(asyncio.get_running_loop().time())
+
+    with pytest.raises(TimeoutExceededError):
+        await admission.async_login(failing)
+    assert admission.failed == 2
+    assert admission.failures == 2
+    # Second failure backs off 0.02 * 2 (with jitter >= 0.5)
+    start = asyncio.get_running_loop().time()
+    await admission.async_login(login)
+    assert calls[-1] - start >= 0.02
+    assert calls[1] - calls[0] >= 0.01
+    assert admission.failures == 0
+
+
+async def test_http_status() -> None:
+    """Test throttling and outages are retried, other errors raised at once."""
+    admission = LoginAdmission(backoff=0.01, tries=3)
+    statuses = [503, 429]
+
+    async def login() -> None:
+        if statuses:
+            status = statuses.pop(0)
+            raise ServiceNotFoundError(f"Service not found ({status})", status)
+
+    await admission.async_login(login)
+    assert admission.failed == 2
+    assert admission.logins == 1
+
+    async def unauthorized() -> None:
+        await asyncio.sleep(0.01)
+        raise ServiceNotFoundError("Service not found (401)", 401)
+
+    with pytest.raises(ServiceNotFoundError):
+        await admission.async_login(unauthorized)
+    assert admission.failed == 3
+    assert admission.failures == 0
+    assert admission.duration_max >= 0.01
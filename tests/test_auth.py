@@ -0,0 +1,302 @@
+"""Tests request pipeline."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from unittest.mock import MagicMock, patch
+
+from aiohttp import ClientSession
+import pytest
+
+from audiconnectpy import (
+    AudiConnect,
+    HedgePolicy,
+    LaneScheduler,
+    ResponseCache,
+    create_session,
+)
+from audiconnectpy.auth import Auth
+from audiconnectpy.exceptions import DeadlineExceededError, TimeoutExceededError
+from audiconnectpy.helpers import deadline, lane
+
+from . import mock_response
+
+USR = "x.y@z.zz"
+PWD = "password"
+COUNTRY = "FR"
+URL = "https://mdk/vehicle/v1/vehicles/WAUZZZF44NA048546/capabilities"
+ENDPOINT = "mdk/vehicle/v1/vehicles/{vin}/capabilities"
+
+
+def slow_first(delay: float = 1):
+    """Return request side effect answering slowly to the first call."""
+    calls = []
+
+    async def request(method, url, **kwargs):
+        calls.append(url)
+        attempt = len(calls)
+        if attempt == 1:
+            await asyncio.sleep(delay)
+        return mock_response({"attempt": attempt}).return_value
+
+    return request, calls
+
+
+async def test_hedged_request() -> None:
+    """Test slow request is hedged and fastest answer wins."""
+    policy = HedgePolicy(min_samples=1, min_delay=0.01)
+    policy.record(ENDPOINT, 0.01)
+    request, calls = slow_first()
+    async with ClientSession() as session:
+        auth = Auth(session, USR, PWD, COUNTRY, "standard", hedging=policy)
+        with patch("aiohttp.ClientSession.request", side_effect=request):
+            rsp = await auth.request("GET", URL)
+
+    assert rsp == {"attempt": 2}
+    assert len(calls) == 2
+    assert policy.hedged == 1
+    assert policy.hedge_wins == 1
+
+
+async def test_hedge_budget() -> None:
+    """Test hedging stops when budget is exhausted."""
+    policy = HedgePolicy(min_samples=1, min_delay=0.01, burst=0)
+    policy.record(ENDPOINT, 0.01)
+    request, calls = slow_first(0.05)
+    async with ClientSession() as session:
+        auth = Auth(session, USR, PWD, COUNTRY, "standard", hedging=policy)
+        with patch("aiohttp.ClientSession.request", side_effect=request):
+            rsp = await auth.request("GET", URL)
+
+    assert rsp == {"attempt": 1}
+    assert len(calls) == 1
+    assert policy.hedged == 0
+
+
+async def test_no_hedge_without_samples() -> None:
+    """Test requests are not hedged until latency is known."""
+    policy = HedgePolicy()
+    request, calls = slow_first(0.05)
+    async with ClientSession() as session:
+        auth = Auth(session, USR, PWD, COUNTRY, "standard", hedging=policy)
+        with patch("aiohttp.ClientSession.request", side_effect=request):
+            await auth.request("GET", URL)
+
+    assert len(calls) == 1
+    assert policy.latencies.count(ENDPOINT) == 1
+
+
+async def test_timeout_recorded() -> None:
+    """Test timed out requests are recorded as latency samples."""
+    policy = HedgePolicy()
+    request, _ = slow_first(0.2)
+    async with ClientSession() as session:
+        auth = Auth(
+            session,
+            USR,
+            PWD,
+            COUNTRY,
+            "standard",
+            hedging=policy,
+            timeouts={"capabilities": 0.05},
+        )
+        with (
+            patch("aiohttp.ClientSession.request", side_effect=request),
+            pytest.raises(TimeoutExceededError),
+        ):
+            await auth.request("GET", URL)
+
+    assert policy.latencies.count(ENDPOINT) == 1
+    assert policy.latencies.percentile(ENDPOINT, 50) >= 0.05
+
+
+async def test_endpoint_timeout() -> None:
+    """Test timeout profiles and deadline."""
+    async with ClientSession() as session:
+        auth = Auth(
+            session, USR, PWD, COUNTRY, "standard", timeouts={"capabilities": 5}
+        )
+        assert auth.request_timeout(URL) == 5
+        assert auth.request_timeout("https://mbb/mobile/oauth2/v1/token") == 30
+        assert auth.request_timeout("https://mdk/vehicle/v1/spin/state") == 120
+
+        with deadline(2):
+            assert auth.request_timeout(URL) <= 2
+            with deadline(60):
+                assert auth.request_timeout(URL) <= 2
+
+
+async def test_deadline_exceeded() -> None:
+    """Test requests are not sent once deadline is exceeded."""
+    request, calls = slow_first(0.2)
+    async with ClientSession() as session:
+        auth = Auth(session, USR, PWD, COUNTRY, "standard")
+        with patch("aiohttp.ClientSession.request", side_effect=request):
+            with deadline(0.1), pytest.raises(DeadlineExceededError):
+                await auth.request("GET", URL)
+            with deadline(0), pytest.raises(DeadlineExceededError):
+                await auth.request("GET", URL)
+
+    assert len(calls) == 1
+
+
+async def test_managed_session() -> None:
+    """Test managed session and connection prewarm."""
+    session = create_session(limit_per_host=4, dns_ttl=60)
+    assert session.connector.limit_per_host == 4
+    assert session.connector.use_dns_cache is True
+
+    api = AudiConnect(session, USR, PWD, COUNTRY)
+    api.auth.uris = {
+        "base_url": "https://app-api.live-my.audi.com",
+        "mdk_url": "https://emea.bff.cariad.digital/",
+        "cv_url": "https://emea.bff.cariad.digital/vehicle/v1",
+        "language": "fr",
+    }
+    with patch.object(session, "head", MagicMock()) as head:
+        await api.async_prewarm()
+
+    hosts = sorted(call.args[0] for call in head.call_args_list)
+    assert hosts == [
+        "https://app-api.live-my.audi.com",
+        "https://emea.bff.cariad.digital",
+        "https://mal-1a.prd.ece.vwg-connect.com",
+    ]
+    await api.async_close()
+    assert not session.closed
+    await session.close()
+
+    api = AudiConnect(None, USR, PWD, COUNTRY)
+    assert api.auth._session is None
+    assert api.auth.session is api.auth.session
+    await api.async_close()
+    assert api.auth.session.closed
+
+
+async def test_coalesced_requests() -> None:
+    """Test identical concurrent GET requests share one request."""
+    request, calls = slow_first(0.05)
+    async with ClientSession() as session:
+        auth = Auth(session, USR, PWD, COUNTRY, "standard")
+        headers = {"Authorization": "Bearer token"}
+        with patch("aiohttp.ClientSession.request", side_effect=request):
+            first, second, other = await asyncio.gather(
+                auth.request("GET", URL, headers=headers),
+                auth.request("GET", URL, headers=headers),
+                auth.request("GET", URL, headers={"Authorization": "Bearer other"}),
+            )
+            assert await auth.request("GET", URL, headers=headers) == {"attempt": 3}
+
+    assert first == second == {"attempt": 1}
+    assert other == {"attempt": 2}
+    assert len(calls) == 3
+    assert auth.coalesced == 1
+    assert not auth._inflight
+
+
+async def test_response_cache() -> None:
+    """Test read endpoints are served from cache."""
+    cache = ResponseCache(ttls={"capabilities": 60})
+    request, calls = slow_first(0)
+    async with ClientSession() as session:
+        auth = Auth(session, USR, PWD, COUNTRY, "standard", cache=cache)
+        with patch("aiohttp.ClientSession.request", side_effect=request):
+            assert await auth.request("GET", URL) == {"attempt": 1}
+            assert await auth.request("GET", URL) == {"attempt": 1}
+            status = URL.replace("capabilities", "selectivestatus")
+            await auth.request("GET", status)
+            await auth.request("GET", status)
+
+    assert len(calls) == 3
+    assert cache.hits == 1
+    assert len(cache) == 1
+
+
+async def test_response_cache_stale() -> None:
+    """Test stale entries are served while revalidated."""
+    cache = ResponseCache(ttls={"capabilities": 60})
+    request, calls = slow_first(0)
+    async with ClientSession() as session:
+        auth = Auth(session, USR, PWD, COUNTRY, "standard", cache=cache)
+        with (
+            patch("aiohttp.ClientSession.request", side_effect=request),
+            patch("audiconnectpy.cache.time") as clock,
+        ):
+            clock.monotonic.return_value = 1000
+            await auth.request("GET", URL)
+            clock.monotonic.return_value = 1090
+            assert await auth.request("GET", URL) == {"attempt": 1}
+            await asyncio.gather(*auth._revalidating.values())
+            assert await auth.request("GET", URL) == {"attempt": 2}
+
+    assert len(calls) == 2
+    assert cache.stale_hits == 1
+
+
+def test_response_cache_eviction() -> None:
+    """Test least recently used entries are evicted."""
+    cache = ResponseCache(max_bytes=100, stale=0)
+    cache.set(("a",), "a", 40, 60)
+    cache.set(("b",), "b", 40, 60)
+    assert cache.get(("a",)) == ("a", True)
+    cache.set(("c",), "c", 40, 60)
+    assert cache.get(("b",)) is None
+    assert cache.size == 80
+    assert cache.evictions == 1
+    cache.set(("d",), "d", 400, 60)
+    assert cache.get(("d",)) is None
+
+
+async def test_priority_lanes() -> None:
+    """Test interactive requests bypass queued background requests."""
+    lanes = LaneScheduler(concurrency=1)
+    calls = []
+
+    async def request(method, url, **kwargs):
+        calls.append(method)
+        await asyncio.sleep(0.01)
+        return mock_response({}).return_value
+
+    async with ClientSession() as session:
+        auth = Auth(session, USR, PWD, COUNTRY, "standard", lanes=lanes)
+        with patch("aiohttp.ClientSession.request", side_effect=request):
+            polls = [
+                asyncio.create_task(auth.request("GET", f"{URL}?page={page}"))
+                for page in range(3)
+            ]
+            await asyncio.sleep(0.005)
+            await auth.request("POST", URL)
+            await asyncio.gather(*polls)
+
+    assert calls == ["GET", "POST", "GET", "GET"]
+    background = lanes.lanes["background"]
+    assert background.served == 3
+    assert background.max_depth == 2
+    assert background.depth == 0
+    assert background.wait_max > 0
+    assert lanes.lanes["interactive"].served == 1
+    assert lanes.active == 0
+    assert auth.request_lane("GET", f"{URL[:-13]}/pendingrequests") == "confirmation"
+    with lane("interactive"):
+        assert auth.request_lane("GET", URL) == "interactive"
+
+
+async def test_lane_deadline() -> None:
+    """Test time queued in a lane counts against the deadline."""
+    lanes = LaneScheduler(concurrency=1)
+    request, calls = slow_first(1)
+    async with ClientSession() as session:
+        auth = Auth(session, USR, PWD, COUNTRY, "standard", lanes=lanes)
+        with patch("aiohttp.ClientSession.request", side_effect=request):
+            holder = asyncio.create_task(auth.request("GET", URL))
+            await asyncio.sleep(0.01)
+            start = time.monotonic()
+            with deadline(0.2), pytest.raises(DeadlineExceededError):
+                await auth.request("GET", f"{URL}?page=1")
+            assert time.monotonic() - start < 0.5
+            await holder
+
+    assert len(calls) == 1
+    assert lanes.active == 0
+    assert lanes.lanes["background"].depth == 0
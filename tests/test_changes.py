@@ -0,0 +1,65 @@
+"""Tests change events."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from audiconnectpy.changes import ChangeEvent, ChangeHub, field_changes
+
+
+def test_field_changes() -> None:
+    """Test changed leaves are returned with dotted paths."""
+    old = {"battery_status": {"current_soc_pct": 50, "range": 200}, "plug": None}
+    new = {"battery_status": {"current_soc_pct": 52, "range": 200}, "plug": "on"}
+    assert sorted(field_changes("charging", old, new)) == [
+        ("charging.battery_status.current_soc_pct", 50, 52),
+        ("charging.plug", None, "on"),
+    ]
+    assert list(field_changes("charging", new, new)) == []
+
+
+async def test_drop_oldest() -> None:
+    """Test oldest events are dropped when the buffer is full."""
+    parent = ChangeHub()
+    hub = ChangeHub(parent)
+    assert hub.active is False
+
+    async with parent.subscribe(maxsize=2) as changes:
+        assert hub.active is True
+        await hub.publish([ChangeEvent("VIN", f"field{i}", i, i + 1) for i in range(3)])
+        assert changes.dropped == 1
+        assert (await anext(changes)).field == "field1"
+
+    assert parent.active is False
+    assert [event.field async for event in changes] == ["field2"]
+
+
+async def test_drop_newest() -> None:
+    """Test new events are dropped when the buffer is full."""
+    hub = ChangeHub()
+    changes = hub.subscribe(maxsize=1, overflow="drop_newest")
+    await hub.publish([ChangeEvent("VIN", "a", 0, 1), ChangeEvent("VIN", "b", 0, 1)])
+    changes.close()
+    assert [event.field async for event in changes] == ["a"]
+    assert changes.dropped == 1
+
+    with pytest.raises(ValueError):
+        hub.subscribe(overflow="unknown")  # type: ignore[arg-type]
+
+
+async def test_block() -> None:
+    """Test publisher waits for the consumer."""
+    hub = ChangeHub()
+    changes = hub.subscribe(maxsize=1, overflow="block")
+    publish = asyncio.create_task(
+        hub.publish([ChangeEvent("VIN", "a", 0, 1), ChangeEvent("VIN", "b", 0, 1)])
+    )
+    await asyncio.sleep(0.01)
+    assert publish.done() is False
+
+    assert (await anext(changes)).field == "a"
+    await publish
+    assert changes.qsize() == 1
+    assert changes.dropped == 0
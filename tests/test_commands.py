@@ -0,0 +1,120 @@
+"""Tests command queue."""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import patch
+
+from aiohttp import ClientSession
+import pytest
+
+from audiconnectpy import LaneScheduler
+from audiconnectpy.auth import Auth
+from audiconnectpy.commands import CommandQueue, command
+from audiconnectpy.exceptions import CommandSupersededError
+
+from . import mock_response
+
+URL = "https://mal-1a.prd.ece.vwg-connect.com/rolesrights/authorization/v2/vehicles/WAUZZZF44NA048546/services/rlu_v1/operations/LOCK/security-pin-auth-requested"
+
+
+class Car:
+    """Vehicle stub."""
+
+    tracer = None
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self.commands = CommandQueue()
+        self.sent: list[str] = []
+
+    @command("lock")
+    async def async_set_lock(self, lock: bool) -> bool:
+        """Lock or unlock."""
+        self.sent.append("lock" if lock else "unlock")
+        await asyncio.sleep(0.01)
+        return lock
+
+    @command("timer_{timer_id}")
+    async def async_set_timer(self, timer_id: int, enable: bool) -> None:
+        """Enable timer."""
+        self.sent.append(f"timer_{timer_id}")
+        await asyncio.sleep(0.01)
+
+
+async def test_command_queue() -> None:
+    """Test commands of a vehicle are serialized and superseded."""
+    car = Car()
+    first = asyncio.create_task(car.async_set_lock(True))
+    await asyncio.sleep(0)
+    queued = asyncio.create_task(car.async_set_lock(True))
+    timers = [
+        asyncio.create_task(car.async_set_timer(timer_id, enable=True))
+        for timer_id in (1, 2)
+    ]
+    await asyncio.sleep(0)
+    assert car.commands.running == "lock"
+    assert len(car.commands) == 3
+
+    unlock = asyncio.create_task(car.async_set_lock(False))
+    with pytest.raises(CommandSupersededError):
+        await queued
+
+    assert await first is True
+    assert await unlock is False
+    await asyncio.gather(*timers)
+    assert car.sent == ["lock", "timer_1", "timer_2", "unlock"]
+    assert car.commands.executed == 4
+    assert car.commands.superseded == 1
+    assert car.commands.running is None
+
+
+async def test_vehicles_run_concurrently() -> None:
+    """Test commands of different vehicles are not serialized."""
+    cars = [Car() for _ in range(5)]
+    tasks = [asyncio.create_task(car.async_set_lock(True)) for car in cars]
+    await asyncio.sleep(0)
+    assert all(car.commands.running == "lock" for car in cars)
+    await asyncio.gather(*tasks)
+
+
+async def test_cancelled_command() -> None:
+    """Test a cancelled queued command gives its turn to the next one."""
+    car = Car()
+    first = asyncio.create_task(car.async_set_lock(True))
+    await asyncio.sleep(0)
+    cancelled = asyncio.create_task(car.async_set_timer(1, enable=True))
+    timer = asyncio.create_task(car.async_set_timer(2, enable=True))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+
+    await asyncio.gather(first, timer)
+    assert car.sent == ["lock", "timer_2"]
+
+
+async def test_command_lane() -> None:
+    """Test requests of a command, GET included, are sent in the interactive lane."""
+    lanes = LaneScheduler(concurrency=1)
+
+    class Remote(Car):
+        """Vehicle stub sending requests."""
+
+        def __init__(self, auth: Auth) -> None:
+            """Initialize."""
+            super().__init__()
+            self.auth = auth
+
+        @command("lock")
+        async def async_set_lock(self, lock: bool) -> bool:
+            """Get security token, then lock."""
+            await self.auth.request("GET", URL)
+            await self.auth.request("POST", URL)
+            return lock
+
+    async with ClientSession() as session:
+        auth = Auth(session, "x.y@z.zz", "password", "FR", "standard", lanes=lanes)
+        with patch("aiohttp.ClientSession.request", mock_response({})):
+            assert await Remote(auth).async_set_lock(True) is True
+
+    assert lanes.lanes["interactive"].served == 2
+    assert lanes.lanes["background"].served == 0
@@ -2,13 +2,18 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 from unittest.mock import patch
 
 from aiohttp import ClientSession
 from multidict import CIMultiDict
+import pytest
 
 from audiconnectpy import AudiConnect
+from audiconnectpy.exceptions import TimeoutExceededError
+from audiconnectpy.fleet import CommandOutcome
+from audiconnectpy.vehicle import Vehicle
 
 from . import mock_response
 
@@ -113,8 +118,12 @@ async def test_connect(fetch_date) -> None:
 
 @patch("audiconnectpy.auth.Auth.async_connect")
 @patch("audiconnectpy.api.AudiConnect._async_fill_url")
+@patch("audiconnectpy.api.AudiConnect.async_update_location")
+@patch("audiconnectpy.api.AudiConnect.async_update_information")
 @patch("audiconnectpy.vehicle.Vehicle.async_update")
-async def test_fetch_data(connect, fill_url, update, vehicles) -> None:
+async def test_fetch_data(
+    connect, fill_url, location, information, update, vehicles
+) -> None:
     """Test fetch data information."""
     api = AudiConnect(
         session=ClientSession(), username=USR, password=PWD, country=COUNTRY, spin=SPIN
@@ -128,8 +137,12 @@ async def test_fetch_data(connect, fill_url, update, vehicles) -> None:
 
 
 @patch("audiconnectpy.auth.Auth.async_connect")
+@patch("audiconnectpy.api.AudiConnect.async_update_location")
+@patch("audiconnectpy.api.AudiConnect.async_update_information")
 @patch("audiconnectpy.vehicle.Vehicle.async_update")
-async def test_get_vehicles(connect, update, vehicles, uris) -> None:
+async def test_get_vehicles(
+    connect, location, information, update, vehicles, uris
+) -> None:
     """Test fetch data information."""
     api = AudiConnect(
         session=ClientSession(), username=USR, password=PWD, country=COUNTRY, spin=SPIN
@@ -140,6 +153,7 @@ async def test_get_vehicles(connect, update, vehicles, uris) -> None:
             side_effect=[
                 mock_response(vehicles)(),
                 mock_response({"homeRegion": {"baseUri": {"content": "mal-xxx"}}})(),
+                mock_response(vehicles)(),
             ],
         ),
     ):
@@ -148,3 +162,103 @@ async def test_get_vehicles(connect, update, vehicles, uris) -> None:
         assert api.vehicles is not None
         assert api.vehicles[0].fill_region.url == "fal-xxx"
         assert api.vehicles[0].fill_region.url_setter == "mal-xxx"
+
+        # Vehicles are kept between cycles
+        vehicle = api.vehicles[0]
+        await api.async_fetch_data()
+        assert api.vehicles == [vehicle]
+        assert api.vehicles[0] is vehicle
+
+
+async def test_update_information(information, uris) -> None:
+    """Test vehicles information is fetched once, in a single request."""
+    api = AudiConnect(
+        session=ClientSession(), username=USR, password=PWD, country=COUNTRY, spin=SPIN
+    )
+    api.auth.uris = {**uris, "base_url": "https://app-api.live-my.audi.com"}
+    user_vehicle = information["data"]["userVehicle"]
+    with patch(
+        "audiconnectpy.api.AudiConnect.async_get_information",
+        return_value={"data": {"v0": user_vehicle, "v1": user_vehicle, "v2": None}},
+    ) as get_information:
+        await api.async_update_information(["VIN0", "VIN1", "VIN2"])
+        await api.async_update_information(["VIN2", "VIN1", "VIN0"])
+
+    get_information.assert_called_once_with(["VIN0", "VIN1", "VIN2"])
+    assert api.vehicle_infos["VIN1"] == information
+    assert api.vehicle_infos["VIN2"] is None
+
+    # GraphQL errors: vehicles are queried again
+    with patch(
+        "audiconnectpy.api.AudiConnect.async_get_information",
+        return_value={"errors": [{"message": "Internal error"}], "data": None},
+    ) as get_information:
+        await api.async_update_information(["VIN3"])
+        await api.async_update_information(["VIN3"])
+    assert get_information.call_count == 2
+    assert "VIN3" not in api.vehicle_infos
+
+    with patch(
+        "audiconnectpy.api.AudiConnect.async_get_information",
+        return_value={
+            "errors": [{"message": "Timeout", "path": ["v1"]}],
+            "data": {"v0": user_vehicle, "v1": None},
+        },
+    ):
+        await api.async_update_information(["VIN4", "VIN5"])
+    assert api.vehicle_infos["VIN4"] == information
+    assert "VIN5" not in api.vehicle_infos
+
+
+@patch("audiconnectpy.auth.Auth.async_get_headers", return_value={})
+async def test_get_information_query(headers, uris) -> None:
+    """Test information query aliases every vehicle."""
+    api = AudiConnect(
+        session=ClientSession(), username=USR, password=PWD, country=COUNTRY, spin=SPIN
+    )
+    api.auth.uris = {**uris, "base_url": "https://app-api.live-my.audi.com"}
+    with patch("audiconnectpy.auth.Auth.request") as request:
+        await api.async_get_information(["VIN0", "VIN1"])
+
+    payload = request.call_args.kwargs["json"]
+    assert payload["variables"] == {"vin0": "VIN0", "vin1": "VIN1"}
+    assert "v1: userVehicle(vehicleCoreId: $vin1)" in payload["query"]
+
+
+async def test_bulk_command(uris, fill_region) -> None:
+    """Test command sent to several vehicles with a report by VIN."""
+    api = AudiConnect(
+        session=ClientSession(), username=USR, password=PWD, country=COUNTRY, spin=SPIN
+    )
+    api.vehicles = [
+        Vehicle(vin=f"VIN{index}", auth=None, uris=uris, fill_region=fill_region)
+        for index in range(4)
+    ]
+    running = []
+
+    async def set_lock(vehicle, lock):
+        running.append(vehicle.vin)
+        await asyncio.sleep(0.01)
+        assert len(running) <= 2
+        running.remove(vehicle.vin)
+        if vehicle.vin == "VIN2":
+            raise TimeoutExceededError("Cannot lock vehicle, operation timed out")
+
+    with patch(
+        "audiconnectpy.vehicle.Vehicle.async_set_lock",
+        autospec=True,
+        side_effect=set_lock,
+    ) as lock:
+        report = await api.async_set_lock(True, concurrency=2)
+        assert lock.call_count == 4
+        assert report.succeeded == ["VIN0", "VIN1", "VIN3"]
+        assert report.failed == ["VIN2"]
+        assert report["VIN2"].error == "Cannot lock vehicle, operation timed out"
+
+        report = await api.async_set_lock(False, vins=["vin1", "VIN9"])
+        assert report.succeeded == ["VIN1"]
+        assert report["VIN9"] == CommandOutcome("VIN9", False, "Vehicle not found")
+
+    for command in ("async_update", "vin", "async_unknown"):
+        with pytest.raises(ValueError, match="Unknown command"):
+            await api.async_bulk_command(command)
@@ -0,0 +1,51 @@
+"""Tests Prometheus exporter."""
+
+from __future__ import annotations
+
+from aiohttp import ClientSession
+
+from audiconnectpy import Metrics, MetricsServer
+from audiconnectpy.exporter import render_prometheus
+
+
+def test_render_prometheus() -> None:
+    """Test text format of counters and histograms."""
+    metrics = Metrics(buckets=(0.1, 1))
+    metrics.inc("vehicles_updated_total", 3)
+    metrics.observe("request_seconds", 0.05, endpoint="a/{vin}", status="200")
+    metrics.observe("request_seconds", 2, endpoint="a/{vin}", status="200")
+    metrics.observe("token_refresh_seconds", 0.5, result='say "hi"')
+
+    assert render_prometheus(metrics, "audi").splitlines() == [
+        "# HELP audi_vehicles_updated_total Vehicles updated.",
+        "# TYPE audi_vehicles_updated_total counter",
+        "audi_vehicles_updated_total 3.0",
+        "# HELP audi_request_seconds Duration of requests by endpoint.",
+        "# TYPE audi_request_seconds histogram",
+        'audi_request_seconds_bucket{endpoint="a/{vin}",status="200",le="0.1"} 1',
+        'audi_request_seconds_bucket{endpoint="a/{vin}",status="200",le="1.0"} 1',
+        'audi_request_seconds_bucket{endpoint="a/{vin}",status="200",le="+Inf"} 2',
+        'audi_request_seconds_sum{endpoint="a/{vin}",status="200"} 2.05',
+        'audi_request_seconds_count{endpoint="a/{vin}",status="200"} 2',
+        "# HELP audi_token_refresh_seconds Duration of token refreshes.",
+        "# TYPE audi_token_refresh_seconds histogram",
+        'audi_token_refresh_seconds_bucket{result="say \\"hi\\"",le="0.1"} 0',
+        'audi_token_refresh_seconds_bucket{result="say \\"hi\\"",le="1.0"} 1',
+        'audi_token_refresh_seconds_bucket{result="say \\"hi\\"",le="+Inf"} 1',
+        'audi_token_refresh_seconds_sum{result="say \\"hi\\""} 0.5',
+        'audi_token_refresh_seconds_count{result="say \\"hi\\""} 1',
+    ]
+
+
+async def test_metrics_server() -> None:
+    """Test metrics are served over HTTP."""
+    metrics = Metrics()
+    metrics.inc("sections_skipped_total", 2)
+    async with (
+        MetricsServer(metrics, port=0) as server,
+        ClientSession() as session,
+        session.get(server.url) as response,
+    ):
+        assert response.status == 200
+        assert response.content_type == "text/plain"
+        assert "audiconnect_sections_skipped_total 2.0" in await response.text()
@@ -0,0 +1,58 @@
+"""Tests priority lanes."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from audiconnectpy import LaneScheduler
+
+
+async def test_weighted_fair_queuing() -> None:
+    """Test backlogged lanes are served in proportion to their weight."""
+    lanes = LaneScheduler(concurrency=1, weights={"interactive": 2})
+    order = []
+
+    async def run(lane: str) -> None:
+        async with lanes.slot(lane):
+            order.append(lane)
+            await asyncio.sleep(0)
+
+    await lanes.acquire("background")
+    tasks = [asyncio.create_task(run("background")) for _ in range(3)]
+    tasks += [asyncio.create_task(run("interactive")) for _ in range(4)]
+    await asyncio.sleep(0)
+    assert lanes.lanes["background"].depth == 3
+    assert lanes.lanes["interactive"].depth == 4
+
+    lanes.release()
+    await asyncio.gather(*tasks)
+    # Virtual finish tags: interactive 1.5, 2, 2.5, 3 - background 2, 3, 4
+    assert order == [
+        "interactive",
+        "background",
+        "interactive",
+        "interactive",
+        "background",
+        "interactive",
+        "background",
+    ]
+
+
+async def test_cancelled_waiter() -> None:
+    """Test a cancelled request leaves its slot to the next one."""
+    lanes = LaneScheduler(concurrency=1)
+    await lanes.acquire("background")
+    cancelled = asyncio.create_task(lanes.acquire("background"))
+    waiting = asyncio.create_task(lanes.acquire("confirmation"))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    await asyncio.sleep(0)
+
+    lanes.release()
+    await waiting
+    assert lanes.active == 1
+
+    with pytest.raises(ValueError):
+        await lanes.acquire("unknown")
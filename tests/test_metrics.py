@@ -0,0 +1,101 @@
+"""Tests instrumentation."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, patch
+
+from aiohttp import ClientSession
+
+from audiconnectpy import HedgePolicy, LoopLagProbe, Metrics
+from audiconnectpy.auth import Auth
+
+from . import mock_response
+
+URL = "https://mdk/vehicle/v1/vehicles/WAUZZZF44NA048546/capabilities"
+ENDPOINT = "mdk/vehicle/v1/vehicles/{vin}/capabilities"
+
+
+def test_registry() -> None:
+    """Test counters, histograms and listeners."""
+    metrics = Metrics(buckets=(0.1, 1))
+    events = []
+    remove = metrics.add_listener(lambda *event: events.append(event))
+    metrics.observe("request_seconds", 0.05, endpoint="a")
+    metrics.observe("request_seconds", 2, endpoint="a")
+    metrics.inc("response_bytes_total", 10, endpoint="a")
+    remove()
+    metrics.inc("response_bytes_total", 5, endpoint="a")
+
+    histogram = metrics.histogram("request_seconds", endpoint="a")
+    assert histogram is not None
+    assert histogram.counts == [1, 0, 1]
+    assert (histogram.count, histogram.sum, histogram.max) == (2, 2.05, 2)
+    assert metrics.counter("response_bytes_total", endpoint="a") == 15
+    assert events[0] == ("request_seconds", 0.05, {"endpoint": "a"})
+    assert len(events) == 3
+
+
+async def test_request_metrics() -> None:
+    """Test requests are timed by endpoint template and status."""
+    metrics = Metrics()
+    response = mock_response({"capabilities": []})
+    response.return_value.read = AsyncMock(return_value=b'{"capabilities": []}')
+    async with ClientSession() as session:
+        auth = Auth(session, "x.y@z.zz", "password", "FR", "standard", metrics=metrics)
+        with patch("aiohttp.ClientSession.request", response):
+            await auth.request("GET", URL)
+            await auth.request("GET", URL)
+
+    labels = {"endpoint": ENDPOINT, "method": "GET", "status": "200"}
+    histogram = metrics.histogram("request_seconds", **labels)
+    assert histogram is not None
+    assert histogram.count == 2
+    assert metrics.counter("response_bytes_total", endpoint=ENDPOINT) == 40
+
+
+async def test_cancelled_request_metrics() -> None:
+    """Test a cancelled hedge loser is not recorded as timed out."""
+    metrics = Metrics()
+    policy = HedgePolicy(min_samples=1, min_delay=0.01)
+    policy.record(ENDPOINT, 0.01)
+    calls = []
+
+    async def request(method, url, **kwargs):
+        calls.append(url)
+        if len(calls) == 1:
+            await asyncio.sleep(1)
+        return mock_response({}).return_value
+
+    async with ClientSession() as session:
+        auth = Auth(
+            session,
+            "x.y@z.zz",
+            "password",
+            "FR",
+            "standard",
+            hedging=policy,
+            metrics=metrics,
+        )
+        with patch("aiohttp.ClientSession.request", side_effect=request):
+            await auth.request("GET", URL)
+            await asyncio.sleep(0)
+
+    assert policy.hedge_wins == 1
+    labels = {"endpoint": ENDPOINT, "method": "GET"}
+    assert metrics.histogram("request_seconds", **labels, status="timeout") is None
+    assert metrics.histogram("request_seconds", **labels, status="200").count == 1
+
+
+async def test_loop_lag_probe() -> None:
+    """Test blocking the loop is measured."""
+    metrics = Metrics()
+    async with LoopLagProbe(metrics, interval=0.01):
+        await asyncio.sleep(0.02)
+        time.sleep(0.05)  # noqa: ASYNC251 - block the loop on purpose
+        await asyncio.sleep(0.02)
+
+    histogram = metrics.histogram("loop_lag_seconds")
+    assert histogram is not None
+    assert histogram.max >= 0.03
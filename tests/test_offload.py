@@ -0,0 +1,32 @@
+"""Tests offload of large payloads."""
+
+from __future__ import annotations
+
+import threading
+
+from audiconnectpy.helpers import json_loads
+from audiconnectpy.model import Model
+from audiconnectpy.offload import Offloader
+
+
+async def test_offload_threshold() -> None:
+    """Test only payloads above the threshold leave the loop thread."""
+    offload = Offloader(threshold=10)
+
+    def decode(data: bytes) -> tuple[object, int]:
+        return json_loads(data), threading.get_ident()
+
+    loop_thread = threading.get_ident()
+    assert await offload.async_run(2, decode, b"{}") == ({}, loop_thread)
+    rsp, thread = await offload.async_run(20, decode, b'{"count": 12345678}')
+    assert rsp == {"count": 12345678}
+    assert thread != loop_thread
+    assert await offload.async_run(0, json_loads, b" ") is None
+    assert (offload.inline, offload.offloaded, offload.offloaded_bytes) == (2, 1, 20)
+
+
+async def test_offload_validation(vehicle_1) -> None:
+    """Test validation in executor gives the same model."""
+    offload = Offloader(threshold=0)
+    model = await offload.async_run(1, Model.model_validate, vehicle_1)
+    assert model == Model(**vehicle_1)
@@ -0,0 +1,120 @@
+"""Tests scheduler."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+import time
+from unittest.mock import patch
+
+from aiohttp import ClientSession
+
+from audiconnectpy import AudiConnect, PollScheduler, RequestBudget
+from audiconnectpy.exceptions import AudiException
+from audiconnectpy.vehicle import Vehicle
+
+USR = "x.y@z.zz"
+PWD = "password"
+COUNTRY = "FR"
+SPIN = 1234
+VIN = "WAUZZZF44NA048546"
+
+
+async def test_interval(uris, fill_region) -> None:
+    """Test interval follows state and reporting cadence."""
+    api = AudiConnect(
+        session=ClientSession(), username=USR, password=PWD, country=COUNTRY, spin=SPIN
+    )
+    scheduler = PollScheduler(api, moving=60, active=300, idle=1800, min_interval=30)
+    vehicle = Vehicle(vin=VIN, auth=None, uris=uris, fill_region=fill_region)
+    assert scheduler.interval(vehicle) == 1800
+
+    vehicle.charging = {"charging_status": {"charging_state": True}}
+    assert scheduler.interval(vehicle) == 300
+
+    vehicle.is_moving = True
+    assert scheduler.interval(vehicle) == 60
+
+    # The vehicle reports every 2 minutes
+    now = datetime.now(timezone.utc)
+    for minutes in (0, 2, 4):
+        vehicle.last_access = now + timedelta(minutes=minutes)
+        scheduler.observe(vehicle)
+    assert scheduler.cadence(VIN) == 120
+    assert scheduler.interval(vehicle) == 120
+
+    assert 108 <= scheduler.schedule(vehicle) - time.monotonic() <= 132
+
+    # Parked, the vehicle reports every hour: cadence resets once it moves
+    vehicle.is_moving = False
+    vehicle.charging = None
+    for hours in (1, 2, 3):
+        vehicle.last_access = now + timedelta(hours=hours)
+        scheduler.observe(vehicle)
+    assert scheduler.interval(vehicle) == 3600
+    vehicle.is_moving = True
+    assert scheduler.interval(vehicle) == 60
+    scheduler.observe(vehicle)
+    assert scheduler.cadence(VIN) is None
+
+
+async def test_poll_due(uris, fill_region) -> None:
+    """Test due vehicles are polled within the budget."""
+    api = AudiConnect(
+        session=ClientSession(), username=USR, password=PWD, country=COUNTRY, spin=SPIN
+    )
+    api.vehicles = [
+        Vehicle(vin=f"VIN{index}", auth=None, uris=uris, fill_region=fill_region)
+        for index in range(3)
+    ]
+    budget = RequestBudget(rate=60, burst=12)
+    scheduler = PollScheduler(api, idle=600, jitter=0, budget=budget)
+
+    with patch("audiconnectpy.vehicle.Vehicle.async_update") as update:
+        # First call only schedules vehicles
+        assert 599 < await scheduler.async_poll_due() <= 600
+        assert update.call_count == 0
+
+        scheduler.next_poll = dict.fromkeys(scheduler.next_poll, 0)
+        delay = await scheduler.async_poll_due()
+
+    # A full update costs 6 requests, the budget allows 2 of them
+    assert update.call_count == scheduler.polls == 2
+    assert scheduler.deferred == 1
+    assert 350 < delay <= 360
+
+
+async def test_account_refresh(uris, fill_region) -> None:
+    """Test account data is refreshed periodically."""
+    api = AudiConnect(
+        session=ClientSession(), username=USR, password=PWD, country=COUNTRY, spin=SPIN
+    )
+    api.vehicles = [Vehicle(vin=VIN, auth=None, uris=uris, fill_region=fill_region)]
+    scheduler = PollScheduler(api, idle=600, account=900, jitter=0)
+
+    with patch.object(api, "async_update_account") as update:
+        assert 599 < await scheduler.async_poll_due() <= 600
+        assert update.call_count == 0
+
+        scheduler.next_account = 0
+        await scheduler.async_poll_due()
+        assert update.call_count == 1
+        assert 899 < scheduler.next_account - time.monotonic() <= 900
+
+
+async def test_run_without_vehicles() -> None:
+    """Test vehicles are fetched when login did not load them."""
+    api = AudiConnect(
+        session=ClientSession(), username=USR, password=PWD, country=COUNTRY, spin=SPIN
+    )
+    api.auth.binded = True
+    scheduler = PollScheduler(api)
+
+    def fetch_data() -> None:
+        api.auth.binded = False
+        raise AudiException("Vehicle(s) not found")
+
+    with patch.object(api, "async_fetch_data", side_effect=fetch_data) as fetch:
+        await scheduler.async_run()
+
+    fetch.assert_called_once()
+    assert scheduler.next_account == 0
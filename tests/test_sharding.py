@@ -0,0 +1,134 @@
+"""Tests sharding of accounts between workers."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, patch
+
+from aiohttp import ClientSession
+
+from audiconnectpy.auth import Auth
+from audiconnectpy.cache import DiscoveryCache
+from audiconnectpy.exceptions import HttpRequestError
+from audiconnectpy.sharding import ShardCoordinator, ShardWorker
+from audiconnectpy.store import SharedStore
+
+PWD = "password"
+
+
+async def test_rebalance_dead_worker() -> None:
+    """Test shards of a dead worker move to the others only."""
+    store = SharedStore()
+    coordinator = ShardCoordinator(store, shards=32, ttl=30)
+    workers = ["a", "b", "c"]
+    for worker in workers:
+        await coordinator.async_assign(worker)
+    shards = {worker: await coordinator.async_assign(worker) for worker in workers}
+    assert set().union(*shards.values()) == set(range(32))
+    assert sum(len(owned) for owned in shards.values()) == 32
+
+    await coordinator.async_leave("c")
+    survivors = {
+        worker: await coordinator.async_assign(worker) for worker in ("a", "b")
+    }
+    assert survivors["a"] | survivors["b"] == set(range(32))
+    assert survivors["a"] >= shards["a"]
+    assert survivors["b"] >= shards["b"]
+
+
+async def test_shared_tokens(uris) -> None:
+    """Test a worker restores tokens and urls stored by another one."""
+    store = SharedStore()
+    discover = AsyncMock(return_value=uris)
+
+    async def login(auth: Auth) -> None:
+        auth._mbb_token = {"access_token": "mbb", "refresh_token": "refresh"}
+        auth._mbb_token_expired = datetime.now() + timedelta(hours=1)
+
+    async with ClientSession() as session:
+        with (
+            patch("audiconnectpy.auth.Auth._async_login", autospec=True) as mock,
+            patch("audiconnectpy.auth.Auth._async_discover_urls", discover),
+        ):
+            mock.side_effect = login
+            for _ in range(2):
+                auth = Auth(
+                    session,
+                    "x.y@z.zz",
+                    PWD,
+                    "FR",
+                    "standard",
+                    store=store,
+                    discovery=DiscoveryCache(store),
+                )
+                await auth.async_connect()
+                assert auth.binded
+                assert auth._mbb_token["access_token"] == "mbb"
+
+    mock.assert_called_once()
+    discover.assert_called_once()
+    assert auth.uris == uris
+
+
+async def test_refresh_shared_tokens() -> None:
+    """Test refresh reloads stored tokens and keeps those of another process."""
+    store = SharedStore()
+    async with ClientSession() as session:
+        auth = Auth(session, "x.y@z.zz", PWD, "FR", "standard", store=store)
+        auth.binded = True
+        auth._mbb_token = {"access_token": "old", "refresh_token": "refresh"}
+        auth._mbb_token_expired = datetime.now() - timedelta(minutes=1)
+        expired = auth._tokens()
+        fresh = {
+            **expired,
+            "mbb": {"access_token": "new", "refresh_token": "refresh"},
+            "mbb_expired": (datetime.now() + timedelta(hours=1)).timestamp(),
+        }
+
+        # Refreshed meanwhile by another process
+        await store.async_set("tokens", auth._username, fresh)
+        with patch("audiconnectpy.auth.Auth._async_get_mbb_token") as refresh:
+            await auth.async_refresh_tokens()
+        refresh.assert_not_called()
+        assert auth._mbb_token["access_token"] == "new"
+
+        # Refreshed by another process while this one failed
+        async def failing(_: Auth, **kwargs: str) -> None:
+            await store.async_set("tokens", auth._username, fresh)
+            raise HttpRequestError("Refresh failed")
+
+        await store.async_set("tokens", auth._username, expired)
+        await auth._async_restore_tokens()
+        with patch("audiconnectpy.auth.Auth._async_get_mbb_token", failing):
+            await auth.async_refresh_tokens()
+        assert not auth.binded
+        assert await store.async_get("tokens", auth._username) == fresh
+
+        # Failed with the stored tokens
+        await store.async_set("tokens", auth._username, expired)
+        await auth._async_restore_tokens()
+        with patch(
+            "audiconnectpy.auth.Auth._async_get_mbb_token",
+            side_effect=HttpRequestError("Refresh failed"),
+        ):
+            await auth.async_refresh_tokens()
+        assert await store.async_get("tokens", auth._username) is None
+    store.close()
+
+
+async def test_worker_accounts() -> None:
+    """Test workers poll disjoint accounts."""
+    store = SharedStore()
+    accounts = [
+        {"username": f"user{index}@z.zz", "password": PWD} for index in range(8)
+    ]
+    workers = [ShardWorker(store, accounts, worker_id=name, shards=4) for name in "ab"]
+    with patch("audiconnectpy.sharding.ShardWorker._async_poll"):
+        for worker in workers * 2:
+            await worker.async_rebalance()
+        owned = [worker.owned for worker in workers]
+        assert owned[0].isdisjoint(owned[1])
+        assert owned[0] | owned[1] == {account["username"] for account in accounts}
+        for worker in workers:
+            assert set(worker.fleet.accounts) == worker.owned
+            await worker.fleet.async_close()
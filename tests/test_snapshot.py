@@ -0,0 +1,52 @@
+"""Tests snapshots."""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+import json
+
+from audiconnectpy.snapshot import StateHistory, dumps, json_patch
+
+
+def test_json_patch() -> None:
+    """Test patch operations."""
+    old = {"charging": {"soc": 50, "mode": "eco"}, "a/b": 1, "doors": [1, 2]}
+    new = {"charging": {"soc": 52}, "a/b": 1, "doors": [1], "access": {}}
+    assert sorted(json_patch(old, new), key=lambda op: op["path"]) == [
+        {"op": "add", "path": "/access", "value": {}},
+        {"op": "remove", "path": "/charging/mode"},
+        {"op": "replace", "path": "/charging/soc", "value": 52},
+        {"op": "replace", "path": "/doors", "value": [1]},
+    ]
+    assert json_patch(new, new) == []
+    assert json_patch(old, None) == [{"op": "replace", "path": "", "value": None}]
+
+
+def test_history() -> None:
+    """Test versions, cached snapshot and diff."""
+    history = StateHistory(size=2)
+    when = datetime(2024, 3, 25, tzinfo=timezone.utc)
+    history.commit({"soc": 50, "last_access": when})
+    history.commit({"soc": 52, "last_access": when})
+
+    snapshot = history.snapshot_json()
+    assert json.loads(snapshot) == {
+        "version": 2,
+        "state": {"soc": 52, "last_access": "2024-03-25T00:00:00+00:00"},
+    }
+    assert history.snapshot_json() is snapshot
+    assert dumps({"a": 1}) == b'{"a":1}'
+
+    assert history.diff(2)["patch"] == []
+    assert history.diff(1) == {
+        "from": 1,
+        "version": 2,
+        "patch": [{"op": "replace", "path": "/soc", "value": 52}],
+    }
+    # Version 0 is out of the history
+    assert history.diff(0)["patch"] == [
+        {"op": "replace", "path": "", "value": history.state}
+    ]
+
+    history.commit({"soc": 53})
+    assert history.snapshot_json() is not snapshot
@@ -0,0 +1,77 @@
+"""Tests profile of updates."""
+
+from __future__ import annotations
+
+from unittest.mock import AsyncMock, patch
+
+from aiohttp import ClientSession
+
+from audiconnectpy import AudiConnect, ResponseCache
+from audiconnectpy.auth import Auth
+from audiconnectpy.stats import UpdateStats, collect
+
+from . import mock_response
+
+USR = "x.y@z.zz"
+PWD = "password"
+URL = "https://mdk/vehicle/v1/vehicles/WAUZZZF44NA048546/capabilities"
+
+
+async def test_request_stats() -> None:
+    """Test requests of a context are profiled."""
+    response = mock_response({"capabilities": []})
+    response.return_value.read = AsyncMock(return_value=b'{"capabilities": []}')
+    stats = UpdateStats()
+    async with ClientSession() as session:
+        auth = Auth(session, USR, PWD, "FR", "standard", cache=ResponseCache())
+        with patch("aiohttp.ClientSession.request", response), collect(stats):
+            await auth.request("GET", URL)
+            await auth.request("GET", URL)
+        await auth.request("GET", URL)
+
+    assert (stats.requests, stats.bytes, stats.cache_hits) == (1, 20, 1)
+    assert stats.network > 0
+    assert stats.decode > 0
+
+
+@patch("audiconnectpy.auth.Auth.async_connect")
+@patch("audiconnectpy.api.AudiConnect._async_fill_url")
+async def test_update_stats(
+    connect, fill_url, information, vehicles, vehicle_1, capabilities, uris
+) -> None:
+    """Test update cycles return their profile."""
+    api = AudiConnect(ClientSession(), USR, PWD, "FR")
+    with (
+        patch(
+            "audiconnectpy.api.AudiConnect.async_get_vehicles",
+            return_value=vehicles,
+        ),
+        patch(
+            "audiconnectpy.vehicle.Vehicle.async_get_selectivestatus",
+            return_value=vehicle_1,
+        ),
+        patch(
+            "audiconnectpy.api.AudiConnect.async_get_information",
+            return_value={"data": {"v0": information["data"]["userVehicle"]}},
+        ),
+        patch("audiconnectpy.vehicle.Vehicle.async_get_position", return_value={}),
+        patch("audiconnectpy.api.AudiConnect.async_get_location", return_value={}),
+        patch(
+            "audiconnectpy.vehicle.Vehicle.async_get_capabilities",
+            return_value=capabilities,
+        ),
+    ):
+        api.auth.uris = uris
+        await api.async_login()
+        stats = await api.async_fetch_data()
+    await api.async_close()
+
+    vin = api.vehicles[0].vin
+    vehicle = stats.vehicles[vin]
+    assert vehicle.model == "Audi A4 Berline"
+    assert vehicle.validate > 0
+    assert vehicle.serialize > 0
+    assert "infos" in vehicle.skipped
+    assert "charging" in vehicle.unchanged
+    assert f"{vin}:charging" in stats.unchanged
+    assert stats.elapsed >= vehicle.elapsed
@@ -0,0 +1,85 @@
+"""Tests tracing spans."""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+from aiohttp import ClientSession
+import pytest
+
+from audiconnectpy import SpanRecorder
+from audiconnectpy.auth import Auth
+from audiconnectpy.commands import CommandQueue, command
+
+from . import mock_response
+
+URL = "https://mdk/vehicle/v1/vehicles/WAUZZZF44NA048546/capabilities?token=secret"
+
+
+class Car:
+    """Vehicle stub."""
+
+    def __init__(self, tracer: SpanRecorder) -> None:
+        """Initialize."""
+        self.commands = CommandQueue()
+        self.tracer = tracer
+
+    @command("lock")
+    async def async_set_lock(self, lock: bool) -> None:
+        """Lock or unlock."""
+        with self.tracer.start_as_current_span("GET pendingrequests"):
+            await asyncio.sleep(0)
+
+
+def test_span_recorder() -> None:
+    """Test spans are nested and record errors."""
+    tracer = SpanRecorder()
+    with tracer.start_as_current_span("audi.update", {"audi.vin": "WAU"}) as parent:
+        with tracer.start_as_current_span("GET a"):
+            pass
+        with pytest.raises(ValueError), tracer.start_as_current_span("GET b"):
+            raise ValueError
+
+    first, second, root = tracer.spans
+    assert root is parent
+    assert root.parent is None
+    assert tracer.children(root) == [first, second]
+    assert (first.status, second.status) == ("ok", "error")
+    assert isinstance(second.exception, ValueError)
+    assert root.attributes == {"audi.vin": "WAU"}
+    assert not root.is_recording()
+
+
+async def test_request_spans() -> None:
+    """Test each HTTP call is a child span with a sanitized url."""
+    tracer = SpanRecorder()
+    response = mock_response({})
+    response.return_value.read = AsyncMock(return_value=b"{}")
+    async with ClientSession() as session:
+        auth = Auth(session, "x.y@z.zz", "password", "FR", "standard", tracer=tracer)
+        with (
+            patch("aiohttp.ClientSession.request", response),
+            tracer.start_as_current_span("audi.update"),
+        ):
+            await auth.request("GET", URL)
+
+    span, parent = tracer.spans
+    assert span.parent is parent
+    assert span.name == "GET mdk/vehicle/v1/vehicles/{vin}/capabilities"
+    assert span.attributes == {
+        "http.request.method": "GET",
+        "server.address": "mdk",
+        "url.template": "mdk/vehicle/v1/vehicles/{vin}/capabilities",
+        "http.response.status_code": 200,
+    }
+
+
+async def test_action_span() -> None:
+    """Test commands are parent spans of their requests."""
+    tracer = SpanRecorder()
+    await Car(tracer).async_set_lock(True)
+    request, action = tracer.spans
+    assert action.name == "audi.action"
+    assert action.attributes == {"audi.action": "lock"}
+    assert request.parent is action
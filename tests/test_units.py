@@ -0,0 +1,76 @@
+"""Tests unit conversion."""
+
+from __future__ import annotations
+
+from unittest.mock import patch
+
+from aiohttp import ClientSession
+
+from audiconnectpy import AudiConnect
+from audiconnectpy.units import Measurement, convert_units
+
+USR = "x.y@z.zz"
+PWD = "password"
+
+
+def test_convert_units() -> None:
+    """Test measurements are converted by field suffix."""
+    state = {
+        "charging": {"charge_rate_kmph": 40, "charge_mode": "manual"},
+        "climatisation": {"target_temperature_c": 21, "target_temperature_f": 70},
+        "measurements": {"odometer": 1000, "battery_k": 283.15, "moving": True},
+    }
+    assert convert_units(state) == {
+        "charging.charge_rate": Measurement(40, "km/h"),
+        "climatisation.target_temperature": Measurement(21, "°C"),
+        "measurements.odometer": Measurement(1000, "km"),
+        "measurements.battery": Measurement(10.0, "°C"),
+    }
+    assert convert_units(state, "imperial") == {
+        "charging.charge_rate": Measurement(24.9, "mph"),
+        "climatisation.target_temperature": Measurement(69.8, "°F"),
+        "measurements.odometer": Measurement(621.4, "mi"),
+        "measurements.battery": Measurement(50.0, "°F"),
+    }
+
+
+@patch("audiconnectpy.auth.Auth.async_connect")
+@patch("audiconnectpy.api.AudiConnect._async_fill_url")
+async def test_accounts_unit_systems(
+    connect, fill_url, information, vehicles, vehicle_1, capabilities, uris
+) -> None:
+    """Test accounts in one process keep their own unit system."""
+    session = ClientSession()
+    metric = AudiConnect(session, USR, PWD, "FR")
+    imperial = AudiConnect(session, USR, PWD, "GB", unit_system="imperial")
+    with (
+        patch(
+            "audiconnectpy.api.AudiConnect.async_get_vehicles",
+            return_value=vehicles,
+        ),
+        patch(
+            "audiconnectpy.vehicle.Vehicle.async_get_selectivestatus",
+            return_value=vehicle_1,
+        ),
+        patch(
+            "audiconnectpy.api.AudiConnect.async_get_information",
+            return_value={"data": {"v0": information["data"]["userVehicle"]}},
+        ),
+        patch("audiconnectpy.vehicle.Vehicle.async_get_position", return_value={}),
+        patch("audiconnectpy.api.AudiConnect.async_get_location", return_value={}),
+        patch(
+            "audiconnectpy.vehicle.Vehicle.async_get_capabilities",
+            return_value=capabilities,
+        ),
+    ):
+        for api in (metric, imperial):
+            api.auth.uris = uris
+            await api.async_login()
+    await session.close()
+
+    path = "measurements.odometer_status.odometer"
+    assert metric.vehicles[0].measurement(path) == Measurement(16221, "km")
+    assert imperial.vehicles[0].measurement(path) == Measurement(10079.3, "mi")
+    battery = "measurements.temperature_battery_status.temperature_hv_battery_max"
+    assert metric.vehicles[0].measurement(battery) == Measurement(10.0, "°C")
+    assert imperial.vehicles[0].measurement(battery) == Measurement(50.0, "°F")
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import asyncio
+from copy import deepcopy
 import logging
 from unittest.mock import patch
 
@@ -10,6 +12,8 @@ import pytest
 from syrupy.assertion import SnapshotAssertion
 
 from audiconnectpy import AudiConnect, AudiException
+from audiconnectpy.exceptions import DeadlineExceededError
+from audiconnectpy.vehicle import Vehicle
 
 USR = "x.y@z.zz"
 PWD = "password"
@@ -48,15 +52,15 @@ async def test_vehicle_0(
             return_value=vehicle_0,
         ),
         patch(
-            "audiconnectpy.vehicle.Vehicle.async_get_information",
-            return_value=information,
+            "audiconnectpy.api.AudiConnect.async_get_information",
+            return_value={"data": {"v0": information["data"]["userVehicle"]}},
         ),
         patch(
             "audiconnectpy.vehicle.Vehicle.async_get_position",
             return_value=position,
         ),
         patch(
-            "audiconnectpy.vehicle.Vehicle.async_get_location",
+            "audiconnectpy.api.AudiConnect.async_get_location",
             return_value=location,
         ),
         patch(
@@ -76,6 +80,8 @@ async def test_vehicle_0(
         assert my_vehicle.measurements == snapshot
         assert my_vehicle.oil_level == snapshot
         assert my_vehicle.vehicle_health_warnings == snapshot
+        assert len(api.location.addresses) == location["count"]
+        assert all(vehicle.location is api.location for vehicle in api.vehicles)
 
 
 @patch("audiconnectpy.auth.Auth.async_connect")
@@ -107,15 +113,15 @@ async def test_vehicle_1(
             return_value=vehicle_1,
         ),
         patch(
-            "audiconnectpy.vehicle.Vehicle.async_get_information",
-            return_value=information,
+            "audiconnectpy.api.AudiConnect.async_get_information",
+            return_value={"data": {"v0": information["data"]["userVehicle"]}},
         ),
         patch(
             "audiconnectpy.vehicle.Vehicle.async_get_position",
             return_value=position,
         ),
         patch(
-            "audiconnectpy.vehicle.Vehicle.async_get_location",
+            "audiconnectpy.api.AudiConnect.async_get_location",
             return_value=location,
         ),
         patch(
@@ -171,15 +177,15 @@ async def test_vehicle_2(
             return_value=vehicle_2,
         ),
         patch(
-            "audiconnectpy.vehicle.Vehicle.async_get_information",
-            return_value=information,
+            "audiconnectpy.api.AudiConnect.async_get_information",
+            return_value={"data": {"v0": information["data"]["userVehicle"]}},
         ),
         patch(
             "audiconnectpy.vehicle.Vehicle.async_get_position",
             return_value=position,
         ),
         patch(
-            "audiconnectpy.vehicle.Vehicle.async_get_location",
+            "audiconnectpy.api.AudiConnect.async_get_location",
             return_value=location,
         ),
         patch(
@@ -236,15 +242,15 @@ async def test_vehicle_3(
             return_value=vehicle_3,
         ),
         patch(
-            "audiconnectpy.vehicle.Vehicle.async_get_information",
-            return_value=information,
+            "audiconnectpy.api.AudiConnect.async_get_information",
+            return_value={"data": {"v0": information["data"]["userVehicle"]}},
         ),
         patch(
             "audiconnectpy.vehicle.Vehicle.async_get_position",
             side_effect=AudiException(),
         ),
         patch(
-            "audiconnectpy.vehicle.Vehicle.async_get_location",
+            "audiconnectpy.api.AudiConnect.async_get_location",
             side_effect=AudiException(),
         ),
         patch(
@@ -262,4 +268,304 @@ async def test_vehicle_3(
         assert my_vehicle.charging == snapshot
         assert my_vehicle.position_supported is False
         assert my_vehicle.locations_supported is False
+        assert api.locations_supported is False
         assert my_vehicle.capabilities_supported is True
+
+
+@patch("audiconnectpy.auth.Auth.async_connect")
+@patch("audiconnectpy.api.AudiConnect._async_fill_url")
+async def test_vehicle_sections(
+    connect,
+    fill_url,
+    information,
+    vehicles,
+    vehicle_1,
+    position,
+    location,
+    capabilities,
+    uris,
+) -> None:
+    """Test update of selected sections only."""
+    api = AudiConnect(
+        session=ClientSession(), username=USR, password=PWD, country=COUNTRY, spin=SPIN
+    )
+    charging = deepcopy(vehicle_1["charging"])
+    charging["batteryStatus"]["value"]["currentSOC_pct"] = 12
+
+    with (
+        patch(
+            "audiconnectpy.api.AudiConnect.async_get_vehicles",
+            return_value=vehicles,
+        ),
+        patch(
+            "audiconnectpy.vehicle.Vehicle.async_get_selectivestatus",
+            side_effect=[vehicle_1, {"charging": charging}],
+        ) as selectivestatus,
+        patch(
+            "audiconnectpy.api.AudiConnect.async_get_information",
+            return_value={"data": {"v0": information["data"]["userVehicle"]}},
+        ),
+        patch(
+            "audiconnectpy.vehicle.Vehicle.async_get_position",
+            return_value=position,
+        ) as get_position,
+        patch(
+            "audiconnectpy.api.AudiConnect.async_get_location",
+            return_value=location,
+        ),
+        patch(
+            "audiconnectpy.vehicle.Vehicle.async_get_capabilities",
+            return_value=capabilities,
+        ),
+    ):
+        api.auth.uris = uris
+        await api.async_login()
+        my_vehicle = api.vehicles[0]
+        access = my_vehicle.access
+        last_access = my_vehicle.last_access
+
+        await my_vehicle.async_update(sections=["charging"])
+
+        selectivestatus.assert_called_with(["charging"])
+        assert get_position.call_count == 1
+        assert my_vehicle.charging["battery_status"]["current_soc_pct"] == 12
+        assert my_vehicle.access == access
+        assert my_vehicle.last_access == last_access
+
+        with pytest.raises(ValueError):
+            await my_vehicle.async_update(sections=["unknown"])
+
+
+@patch("audiconnectpy.auth.Auth.async_connect")
+@patch("audiconnectpy.api.AudiConnect._async_fill_url")
+async def test_vehicle_unchanged_sections(
+    connect,
+    fill_url,
+    information,
+    vehicles,
+    vehicle_1,
+    position,
+    location,
+    capabilities,
+    uris,
+) -> None:
+    """Test unchanged sections are not loaded again."""
+    api = AudiConnect(
+        session=ClientSession(), username=USR, password=PWD, country=COUNTRY, spin=SPIN
+    )
+    charging = deepcopy(vehicle_1)
+    charging["charging"]["batteryStatus"]["value"]["currentSOC_pct"] = 12
+
+    with (
+        patch(
+            "audiconnectpy.api.AudiConnect.async_get_vehicles",
+            return_value=vehicles,
+        ),
+        patch(
+            "audiconnectpy.vehicle.Vehicle.async_get_selectivestatus",
+            side_effect=[vehicle_1, vehicle_1, charging],
+        ),
+        patch(
+            "audiconnectpy.api.AudiConnect.async_get_information",
+            return_value={"data": {"v0": information["data"]["userVehicle"]}},
+        ),
+        patch(
+            "audiconnectpy.vehicle.Vehicle.async_get_position",
+            return_value=position,
+        ),
+        patch(
+            "audiconnectpy.api.AudiConnect.async_get_location",
+            return_value=location,
+        ),
+        patch(
+            "audiconnectpy.vehicle.Vehicle.async_get_capabilities",
+            return_value=capabilities,
+        ),
+    ):
+        api.auth.uris = uris
+        await api.async_login()
+        assert api.sections_skipped == 0
+        my_vehicle = api.vehicles[0]
+        access = my_vehicle.access
+        last_access = my_vehicle.last_access
+
+        version = my_vehicle.version
+        snapshot = api.snapshot_json()
+        await api.async_fetch_data()
+        assert my_vehicle.version == version
+        assert api.snapshot_json() == snapshot
+        assert api.diff({my_vehicle.vin: version}) == {}
+        sections = len(my_vehicle.payloads)
+        assert api.sections_skipped == my_vehicle.sections_skipped == sections
+        assert my_vehicle.access == access
+        assert my_vehicle.last_access == last_access
+
+        changes = api.changes()
+        vehicle_changes = my_vehicle.changes()
+        await api.async_fetch_data()
+        assert api.sections_skipped == sections - 1
+        assert my_vehicle.charging["battery_status"]["current_soc_pct"] == 12
+        assert my_vehicle.access == access
+
+        changes.close()
+        vehicle_changes.close()
+        events = [event async for event in changes]
+        assert [(event.field, event.new) for event in events] == [
+            ("charging.battery_status.current_soc_pct", 12)
+        ]
+        assert [event async for event in vehicle_changes] == events
+
+        assert api.diff({my_vehicle.vin: version})[my_vehicle.vin] == {
+            "from": version,
+            "version": version + 1,
+            "patch": [
+                {
+                    "op": "replace",
+                    "path": "/charging/battery_status/current_soc_pct",
+                    "value": 12,
+                }
+            ],
+        }
+
+
+@patch("audiconnectpy.auth.Auth.async_connect")
+@patch("audiconnectpy.api.AudiConnect._async_fill_url")
+async def test_vehicle_deadline(
+    connect,
+    fill_url,
+    information,
+    vehicles,
+    vehicle_1,
+    position,
+    location,
+    capabilities,
+    uris,
+) -> None:
+    """Test services are not flagged unsupported when deadline is exceeded."""
+    api = AudiConnect(
+        session=ClientSession(), username=USR, password=PWD, country=COUNTRY, spin=SPIN
+    )
+
+    async def slow_request(method, url, **kwargs):
+        await asyncio.sleep(1)
+
+    with (
+        patch(
+            "audiconnectpy.api.AudiConnect.async_get_vehicles",
+            return_value=vehicles,
+        ),
+        patch(
+            "audiconnectpy.vehicle.Vehicle.async_get_selectivestatus",
+            return_value=vehicle_1,
+        ),
+        patch(
+            "audiconnectpy.api.AudiConnect.async_get_information",
+            return_value={"data": {"v0": information["data"]["userVehicle"]}},
+        ),
+        patch(
+            "audiconnectpy.vehicle.Vehicle.async_get_position",
+            return_value=position,
+        ),
+        patch(
+            "audiconnectpy.api.AudiConnect.async_get_location",
+            return_value=location,
+        ),
+        patch(
+            "audiconnectpy.vehicle.Vehicle.async_get_capabilities",
+            return_value=capabilities,
+        ),
+    ):
+        api.auth.uris = uris
+        await api.async_login()
+    my_vehicle = api.vehicles[0]
+    assert my_vehicle.capabilities_supported is True
+
+    with (
+        patch("audiconnectpy.auth.Auth.async_get_headers", return_value={}),
+        patch("aiohttp.ClientSession.request", side_effect=slow_request),
+        pytest.raises(DeadlineExceededError),
+    ):
+        await my_vehicle.async_update(timeout=0.1)
+
+    assert my_vehicle.capabilities_supported is True
+
+
+@patch("audiconnectpy.auth.Auth.async_connect")
+@patch("audiconnectpy.api.AudiConnect._async_fill_url")
+async def test_vehicle_without_information(
+    connect,
+    fill_url,
+    vehicles,
+    vehicle_1,
+    position,
+    location,
+    capabilities,
+    uris,
+) -> None:
+    """Test information unknown to the batch query is not fetched again."""
+    api = AudiConnect(
+        session=ClientSession(), username=USR, password=PWD, country=COUNTRY, spin=SPIN
+    )
+
+    with (
+        patch(
+            "audiconnectpy.api.AudiConnect.async_get_vehicles",
+            return_value=vehicles,
+        ),
+        patch(
+            "audiconnectpy.vehicle.Vehicle.async_get_selectivestatus",
+            return_value=vehicle_1,
+        ),
+        patch(
+            "audiconnectpy.api.AudiConnect.async_get_information",
+            return_value={"data": {"v0": None}},
+        ) as get_information,
+        patch(
+            "audiconnectpy.vehicle.Vehicle.async_get_information",
+        ) as get_vehicle_information,
+        patch(
+            "audiconnectpy.vehicle.Vehicle.async_get_position",
+            return_value=position,
+        ),
+        patch(
+            "audiconnectpy.api.AudiConnect.async_get_location",
+            return_value=location,
+        ),
+        patch(
+            "audiconnectpy.vehicle.Vehicle.async_get_capabilities",
+            return_value=capabilities,
+        ),
+    ):
+        api.auth.uris = uris
+        await api.async_login()
+        await api.async_fetch_data()
+
+    assert get_information.call_count == 1
+    assert get_vehicle_information.call_count == 0
+    assert api.vehicles[0].information_supported is False
+
+
+def test_vehicle_subscriptions(uris, fill_region) -> None:
+    """Test update plan of subscribed fields."""
+    vehicle = Vehicle(
+        vin="WAUZZZF44NA048546", auth=None, uris=uris, fill_region=fill_region
+    )
+    plan = vehicle.update_plan()
+    assert plan.sections is None
+    assert plan.requests == plan.full_requests == 6
+
+    unsubscribe = vehicle.subscribe(
+        "charging.battery_status.current_soc_pct", "access.door_lock_status"
+    )
+    vehicle.subscribe("charging.plug_status", "is_moving")
+    plan = vehicle.update_plan()
+    assert plan.sections == {"charging", "access", "position"}
+    assert plan.jobs == ("access", "charging")
+    assert plan.requests == 2
+    assert plan.savings == 4
+
+    unsubscribe()
+    assert vehicle.update_plan().sections == {"charging", "position"}
+
+    with pytest.raises(ValueError):
+        vehicle.subscribe("unknown.field")